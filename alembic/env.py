@@ -0,0 +1,55 @@
+import asyncio
+
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.config import settings
+from src.core.db import Base
+import src.models  # noqa: F401  (registers local tables on Base.metadata)
+
+
+config = context.config
+target_metadata = Base.metadata
+
+# Tables shared with sharq_models are migrated by that package; this service
+# keeps its own version table so the two histories never collide.
+VERSION_TABLE = "alembic_version_user_backend"
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.connection_string,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        version_table=VERSION_TABLE,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        version_table=VERSION_TABLE,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(settings.connection_string)
+
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
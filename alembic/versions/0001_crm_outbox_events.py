@@ -0,0 +1,50 @@
+"""crm outbox events
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "crm_outbox_events",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_crm_outbox_events_status_available_at",
+        "crm_outbox_events",
+        ["status", "available_at"],
+    )
+    op.create_index(
+        "ix_crm_outbox_events_user_id_id",
+        "crm_outbox_events",
+        ["user_id", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_crm_outbox_events_user_id_id", table_name="crm_outbox_events")
+    op.drop_index("ix_crm_outbox_events_status_available_at", table_name="crm_outbox_events")
+    op.drop_table("crm_outbox_events")
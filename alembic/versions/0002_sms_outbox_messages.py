@@ -0,0 +1,50 @@
+"""sms outbox messages
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sms_outbox_messages",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("session_id", sa.Integer(), nullable=True),
+        sa.Column("phone_number", sa.String(length=32), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_sms_outbox_messages_status_available_at",
+        "sms_outbox_messages",
+        ["status", "available_at"],
+    )
+    op.create_index(
+        "ix_sms_outbox_messages_phone_number_id",
+        "sms_outbox_messages",
+        ["phone_number", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sms_outbox_messages_phone_number_id", table_name="sms_outbox_messages")
+    op.drop_index("ix_sms_outbox_messages_status_available_at", table_name="sms_outbox_messages")
+    op.drop_table("sms_outbox_messages")
@@ -0,0 +1,131 @@
+"""partition sms_verification_session by created_at
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:00:00
+
+Rebuilds the table as ``PARTITION BY RANGE (created_at)`` with one partition per
+month, so the sweeper can drop old months instead of deleting row by row and
+lookups bounded by ``created_at`` only scan the current partition.
+
+The table is declared in sharq_models; coordinate with that package before
+running this, since its own migrations must not recreate the table. Postgres
+requires the partition key in every unique index, so the primary key becomes
+``(id, created_at)`` and any other unique index gains ``created_at``; all other
+indexes are recreated as they were.
+"""
+from datetime import date
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.core.config import settings
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "sms_verification_session"
+OLD_TABLE = "sms_verification_session_unpartitioned"
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _move_sequence(source: str, target: str) -> None:
+    # A serial id's sequence is owned by the old table and would be dropped with it
+    op.execute(
+        f"""
+        DO $$
+        DECLARE seq text := pg_get_serial_sequence('{source}', 'id');
+        BEGIN
+            IF seq IS NOT NULL THEN
+                EXECUTE format('ALTER SEQUENCE %s OWNED BY {target}.id', seq);
+                EXECUTE format(
+                    'SELECT setval(%L, COALESCE((SELECT max(id) FROM {target}), 0) + 1, false)', seq
+                );
+            END IF;
+        END $$;
+        """
+    )
+
+
+def _index_definitions(bind, table: str) -> List[str]:
+    """``CREATE INDEX`` statements for every non-primary-key index of ``table``"""
+    rows = bind.execute(
+        sa.text(
+            "SELECT pg_get_indexdef(i.indexrelid), i.indisunique FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indrelid "
+            "WHERE c.relname = :table AND NOT i.indisprimary"
+        ),
+        {"table": table},
+    ).all()
+
+    definitions = []
+    for definition, is_unique in rows:
+        if is_unique and "created_at" not in definition:
+            # Partitioned unique indexes must contain the partition key
+            head, sep, tail = definition.partition(")")
+            definition = f"{head}, created_at{sep}{tail}"
+        definitions.append(definition)
+    return definitions
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    indexes = _index_definitions(bind, TABLE)
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+    op.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            LIKE {OLD_TABLE} INCLUDING ALL EXCLUDING INDEXES
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    # The partition key has to be part of the primary key
+    op.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)")
+
+    oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {OLD_TABLE}")).scalar()
+    today = date.today().replace(day=1)
+    month = (oldest.date() if oldest else today).replace(day=1)
+    # The same months ahead as the sweeper, which keeps extending them
+    while month <= _add_months(today, settings.sms_partition_months_ahead):
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month}') TO ('{upper}')"
+        )
+        month = upper
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}")
+    _move_sequence(OLD_TABLE, TABLE)
+    op.execute(f"DROP TABLE {OLD_TABLE}")
+
+    # pg_get_indexdef names the table, which is called TABLE again; the
+    # original index names are free now that the old table is gone
+    for definition in indexes:
+        op.execute(definition)
+    op.execute(
+        f"CREATE INDEX ix_{TABLE}_phone_number_created_at "
+        f"ON {TABLE} (phone_number, created_at DESC) WHERE verified = false"
+    )
+
+
+def downgrade() -> None:
+    indexes = _index_definitions(op.get_bind(), TABLE)
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+    op.execute(
+        f"CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING ALL EXCLUDING INDEXES)"
+    )
+    op.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id)")
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}")
+    _move_sequence(OLD_TABLE, TABLE)
+    op.execute(f"DROP TABLE {OLD_TABLE} CASCADE")
+    for definition in indexes:
+        op.execute(definition)
@@ -0,0 +1,48 @@
+"""sms delivery reports
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 17:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sms_delivery_reports",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("message_id", sa.BigInteger(), nullable=True),
+        sa.Column("session_id", sa.Integer(), nullable=True),
+        sa.Column("provider_request_id", sa.String(length=64), nullable=True),
+        sa.Column("phone_number", sa.String(length=32), nullable=True),
+        sa.Column("operator", sa.String(length=32), nullable=True),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("status_date", sa.DateTime(), nullable=True),
+        sa.Column("received_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_sms_delivery_reports_message_id",
+        "sms_delivery_reports",
+        ["message_id"],
+    )
+    op.create_index(
+        "ix_sms_delivery_reports_received_at",
+        "sms_delivery_reports",
+        ["received_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sms_delivery_reports_received_at", table_name="sms_delivery_reports")
+    op.drop_index("ix_sms_delivery_reports_message_id", table_name="sms_delivery_reports")
+    op.drop_table("sms_delivery_reports")
@@ -0,0 +1,67 @@
+"""sms broadcasts
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sms_broadcasts",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("filters", postgresql.JSONB(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("last_user_id", sa.Integer(), nullable=True, server_default="0"),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sent", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.Column("lease_until", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_sms_broadcasts_status", "sms_broadcasts", ["status"])
+
+    op.create_table(
+        "sms_broadcast_recipients",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("broadcast_id", sa.BigInteger(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("phone_number", sa.String(length=32), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint(
+            "broadcast_id", "user_id", name="uq_sms_broadcast_recipients_broadcast_user"
+        ),
+    )
+    op.create_index(
+        "ix_sms_broadcast_recipients_broadcast_status_id",
+        "sms_broadcast_recipients",
+        ["broadcast_id", "status", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_sms_broadcast_recipients_broadcast_status_id",
+        table_name="sms_broadcast_recipients",
+    )
+    op.drop_table("sms_broadcast_recipients")
+    op.drop_index("ix_sms_broadcasts_status", table_name="sms_broadcasts")
+    op.drop_table("sms_broadcasts")
@@ -0,0 +1,29 @@
+"""user password changes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_password_changes",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_password_changes")
@@ -1,15 +1,52 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.staticfiles import StaticFiles
 from src.api import api_router
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
-from src.core.docs_auth import DocsAuthMiddleware
+from fastapi.security import HTTPBasicCredentials
+from src.core.docs_auth import DocsAuthMiddleware, security, verify_docs_credentials
 from src.core.model_config import configure_models
+from src.core.db import AsyncSessionLocal
+from src.core.kv import close_kv_store, get_kv_store
+from src.service.amo import close_amocrm_service
+from src.service.amo_webhook import lead_status_buffer
+from src.service.role import RoleService
+from src.service.sms import check_sms_callback_config
+from src.service.sms_delivery import delivery_report_buffer
+from src.utils.auth import password_executor
+from src.utils.phone_index import phone_index
 
 configure_models()
 
-app = FastAPI(title="Sharq Admissions API", description="API for the Admissions system")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail at startup, not on the first login, when the shared store is missing
+    get_kv_store()
+    check_sms_callback_config()
+    async with AsyncSessionLocal() as session:
+        await RoleService(session).load_registry()
+        await phone_index.warm(session)
+    # AmoCRM is only called from the workers, which warm its schema themselves
+    phone_index.start(AsyncSessionLocal)
+    lead_status_buffer.start()
+    delivery_report_buffer.start()
+    yield
+    await delivery_report_buffer.stop()
+    await lead_status_buffer.stop()
+    await phone_index.stop()
+    await close_amocrm_service()
+    await close_kv_store()
+    password_executor.shutdown()
+
+
+app = FastAPI(
+    title="Sharq Admissions API",
+    description="API for the Admissions system",
+    lifespan=lifespan,
+)
 
 # Mount the uploads directory to serve static files
 app.mount("/uploads", StaticFiles(directory="uploads/"), name="uploads")
@@ -23,6 +60,16 @@ app.add_middleware(DocsAuthMiddleware)
 def health_check():
     return {"status": "ok"}
 
+@app.get("/health/executor", include_in_schema=False)
+def executor_stats(credentials: HTTPBasicCredentials = Depends(security)):
+    if not verify_docs_credentials(credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Basic"},
+        )
+    return {"password_hashing": password_executor.stats()}
+
 @app.get("/", include_in_schema=False)
 def root():
     return RedirectResponse(url="/docs")
@@ -0,0 +1,131 @@
+"""
+Measure login throughput per API worker.
+
+Against a running server (start it with one uvicorn worker to get per-worker numbers)::
+
+    python -m scripts.bench_login --url http://localhost:8000 --phone 998901234567 --password secret
+
+While logins run, ``/health`` is polled to show how long other requests wait.
+Executor stats are at ``/health/executor`` behind the docs credentials.
+Run once on a build that hashes inline and once on this one to compare.
+
+Without a server or database, ``--offline`` runs the same bcrypt verification
+inline on the event loop and through ``password_executor`` side by side::
+
+    python -m scripts.bench_login --offline
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def report(title: str, elapsed: float, latencies: List[float], probes: List[float]):
+    print(f"{title}:")
+    print(f"  logins/s      {len(latencies) / elapsed:8.1f}")
+    print(f"  login p50/p95 {percentile(latencies, 0.5) * 1000:8.1f} / {percentile(latencies, 0.95) * 1000:.1f} ms")
+    if probes:
+        print(
+            f"  other request p50/max {statistics.median(probes) * 1000:8.1f} / "
+            f"{max(probes) * 1000:.1f} ms"
+        )
+
+
+async def run_load(
+    login: Callable[[], Awaitable[None]],
+    probe: Callable[[], Awaitable[None]],
+    requests: int,
+    concurrency: int,
+):
+    latencies: List[float] = []
+    probes: List[float] = []
+    remaining = requests
+    done = asyncio.Event()
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.monotonic()
+            await login()
+            latencies.append(time.monotonic() - started)
+
+    async def prober():
+        while not done.is_set():
+            started = time.monotonic()
+            await probe()
+            probes.append(time.monotonic() - started)
+            await asyncio.sleep(0.05)
+
+    probe_task = asyncio.create_task(prober())
+    started = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    done.set()
+    await probe_task
+    return elapsed, latencies, probes
+
+
+async def bench_http(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=60.0) as client:
+        async def login():
+            response = await client.post(
+                "/api/auth/login",
+                data={"username": args.phone, "password": args.password},
+            )
+            response.raise_for_status()
+
+        async def probe():
+            await client.get("/health")
+
+        await login()
+        elapsed, latencies, probes = await run_load(login, probe, args.requests, args.concurrency)
+        report(args.url, elapsed, latencies, probes)
+
+
+async def bench_offline(args):
+    from src.utils.auth import password_executor, pwd_context, verify_password_async
+
+    hashed = pwd_context.hash(args.password)
+
+    async def inline():
+        pwd_context.verify(args.password, hashed)
+
+    async def pooled():
+        await verify_password_async(args.password, hashed)
+
+    async def probe():
+        await asyncio.sleep(0)
+
+    for title, login in (("inline on the event loop", inline), ("bcrypt executor", pooled)):
+        elapsed, latencies, probes = await run_load(login, probe, args.requests, args.concurrency)
+        report(title, elapsed, latencies, probes)
+    print(f"executor: {password_executor.stats()}")
+    password_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--phone", default="")
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--offline", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(bench_offline(args) if args.offline else bench_http(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from .passport_data import passport_data_router
 from .study_info import application_router
 from .sms import sms_router
 from .contract import report_router
+from .amo_webhook import amo_webhook_router
+from .sms_broadcast import sms_broadcast_router
 
 api_router = APIRouter(prefix="/api")
 
@@ -12,4 +14,5 @@ api_router.include_router(auth_router)
 api_router.include_router(passport_data_router)
 api_router.include_router(application_router)
 api_router.include_router(report_router)
-
+api_router.include_router(amo_webhook_router)
+api_router.include_router(sms_broadcast_router)
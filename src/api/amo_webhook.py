@@ -0,0 +1,22 @@
+import secrets
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from src.core.config import settings
+from src.service.amo_webhook import lead_status_buffer, parse_lead_events
+
+amo_webhook_router = APIRouter(prefix="/amocrm", tags=["AmoCRM"])
+
+
+@amo_webhook_router.post("/webhook", include_in_schema=False)
+async def receive_amocrm_webhook(request: Request, token: str = Query("")):
+    if not settings.amo_crm_webhook_secret or not secrets.compare_digest(
+        token, settings.amo_crm_webhook_secret
+    ):
+        raise HTTPException(status_code=403, detail="Ruxsat berilmagan")
+
+    form = await request.form()
+    events = parse_lead_events(form.multi_items())
+    # AmoCRM expects a fast 2xx, the statuses are written by the buffer
+    lead_status_buffer.add(events)
+    return {"accepted": len(events)}
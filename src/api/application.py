@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends
 from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.service.application import ApplicationCrud
-from sharq_models.models import User # type: ignore
+from src.schemas.user import CurrentUser
 from src.core.db import get_db
 from src.utils.auth import require_roles
 
@@ -16,7 +16,7 @@ def get_service_crud(db: AsyncSession = Depends(get_db)):
 @application_router.post("/create")
 async def application_create(
     service: Annotated[ApplicationCrud, Depends(get_service_crud)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ):
     return await service.application_creation(user_id=current_user.id)
 
@@ -24,6 +24,6 @@ async def application_create(
 @application_router.get("")
 async def get_application_by_user_id(
     service: Annotated[ApplicationCrud, Depends(get_service_crud)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ):
     return await service.get_application_by_user_id(user_id=current_user.id)
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from src.core.db import get_db
 from src.service.auth import UserAuthService
 from typing import Annotated
+from src.utils.rate_limit import (
+    get_client_ip,
+    record_login_success,
+    reserve_login_attempt,
+)
+from src.utils.utils import normalize_phone
 
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -14,8 +20,16 @@ def get_auth_servie(db: AsyncSession = Depends(get_db)):
 
 @auth_router.post("/login")
 async def login(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     service: Annotated[UserAuthService, Depends(get_auth_servie)],
 ):
+    phone_number = normalize_phone(form_data.username)
+    client_ip = get_client_ip(request)
+    # Reserved up front, so concurrent guesses cannot all pass before a lockout is set;
+    # a failed login simply keeps its reservation
+    await reserve_login_attempt(phone_number, client_ip)
+
     user_token = await service.login(form_data=form_data)
+    await record_login_success(phone_number, client_ip)
     return user_token
@@ -6,7 +6,7 @@ from typing import Annotated
 
 
 from fastapi.responses import Response
-from sharq_models.models import User # type: ignore
+from src.schemas.user import CurrentUser
 from src.utils.auth import require_roles 
 
 report_router = APIRouter(prefix="/contract", tags=["Contract Reports"])
@@ -21,7 +21,7 @@ def get_report_service(db: AsyncSession = Depends(get_db)):
 @report_router.get("/download/two_side")
 async def download_two_side_pdf(
     service: Annotated[ReportService, Depends(get_report_service)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ):
     result = await service.get_two_side_report(user_id=current_user.id)
     if result is None:
@@ -38,7 +38,7 @@ async def download_two_side_pdf(
 @report_router.get("/download/three_side")
 async def download_three_side_pdf(
     service: Annotated[ReportService, Depends(get_report_service)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ):
     result = await service.get_three_side_report(user_id=current_user.id)
     if result is None:
@@ -54,6 +54,6 @@ async def download_three_side_pdf(
 @report_router.get("/get_status")
 async def get_user_comtract_status(
     service: Annotated[ReportService, Depends(get_report_service)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ):
     return await service.check_by_status(user_id=current_user.id)
@@ -7,7 +7,7 @@ from src.schemas.passport_data import (
     PassportDataCreateRequest,
 )
 from src.core.db import get_db
-from sharq_models.models import User #type: ignore
+from src.schemas.user import CurrentUser
 from src.utils.auth import require_roles
 from typing import Annotated
 
@@ -23,7 +23,7 @@ def get_service_crud(db: AsyncSession = Depends(get_db)):
 async def create_passport_data(
     passport_data_item: PassportDataCreateRequest,
     service: Annotated[PassportDataCrud, Depends(get_service_crud)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ) -> PassportDataResponse:
     passport_data_item = PassportDataBase(
         jshshir=passport_data_item.jshshir,
@@ -38,6 +38,6 @@ async def create_passport_data(
 @passport_data_router.get("")
 async def get_by_passport_data_id(
     service: Annotated[PassportDataCrud, Depends(get_service_crud)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ) -> PassportDataResponse:
     return await service.get_passport_data_by_user_id(user_id=current_user.id)
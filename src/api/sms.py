@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, Request
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
+from src.core.config import settings
 from src.core.db import get_db
 from src.service.sms import SMSVerificationService , SMSResetPassword
 from src.service.auth import UserAuthService
+from src.service.sms_delivery import delivery_report_buffer, parse_delivery_report
 from src.schemas.sms import (
     ResetPasswordRequest,
     SendVerificationCodeRequest,
@@ -47,8 +51,21 @@ async def register_with_verification(
 
 
 @sms_router.post("/callback", include_in_schema=False)
-async def sms_callback(request: Request):
-    print(request.body)
+async def sms_callback(request: Request, token: str = Query("")):
+    if not settings.sms_callback_secret or not secrets.compare_digest(
+        token, settings.sms_callback_secret
+    ):
+        raise HTTPException(status_code=403, detail="Ruxsat berilmagan")
+
+    if request.headers.get("content-type", "").startswith("application/json"):
+        data = await request.json()
+    else:
+        data = await request.form()
+
+    report = parse_delivery_report(data)
+    if report:
+        # Written in batches by the buffer, Eskiz only needs a fast 200
+        delivery_report_buffer.add(report)
     return {"message": "SMS callback received"}
 
 
@@ -66,5 +83,9 @@ async def reset_password(
     request: ResetPasswordRequest,
     service: Annotated[SMSResetPassword, Depends(get_reset_password)],
 ):
-    return await service.reset_password(verification_code=request.verification_code , new_password=request.new_password)
+    return await service.reset_password(
+        phone_number=request.phone_number,
+        verification_code=request.verification_code,
+        new_password=request.new_password,
+    )
     
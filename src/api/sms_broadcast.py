@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, Optional
+
+from src.core.config import settings
+from src.core.db import get_db
+from src.models import SMSBroadcast
+from src.service.sms_broadcast import SMSBroadcastService
+from src.schemas.sms_broadcast import (
+    BroadcastCreateRequest,
+    BroadcastRecipientListResponse,
+    BroadcastResponse,
+)
+from src.utils.auth import require_roles
+from src.schemas.user import CurrentUser
+
+sms_broadcast_router = APIRouter(prefix="/sms/broadcasts", tags=["SMS Broadcasts"])
+
+
+def get_broadcast_service(db: AsyncSession = Depends(get_db)):
+    return SMSBroadcastService(db)
+
+
+def broadcast_response(broadcast: SMSBroadcast) -> BroadcastResponse:
+    return BroadcastResponse(
+        id=broadcast.id,
+        title=broadcast.title,
+        message=broadcast.message,
+        filters=broadcast.filters,
+        status=broadcast.status,
+        total=broadcast.total,
+        sent=broadcast.sent,
+        failed=broadcast.failed,
+        pending=broadcast.total - broadcast.sent - broadcast.failed,
+        collecting=broadcast.last_user_id is not None,
+        created_at=broadcast.created_at,
+        finished_at=broadcast.finished_at,
+    )
+
+
+@sms_broadcast_router.post("", response_model=BroadcastResponse)
+async def create_broadcast(
+    request: BroadcastCreateRequest,
+    service: Annotated[SMSBroadcastService, Depends(get_broadcast_service)],
+    current_user: Annotated[CurrentUser, Depends(require_roles(settings.sms_broadcast_roles))],
+):
+    broadcast = await service.create_broadcast(request, created_by=current_user.id)
+    return broadcast_response(broadcast)
+
+
+@sms_broadcast_router.get("/{broadcast_id}", response_model=BroadcastResponse)
+async def get_broadcast(
+    broadcast_id: int,
+    service: Annotated[SMSBroadcastService, Depends(get_broadcast_service)],
+    current_user: Annotated[CurrentUser, Depends(require_roles(settings.sms_broadcast_roles))],
+):
+    broadcast = await service.get_broadcast(broadcast_id)
+    return broadcast_response(broadcast)
+
+
+@sms_broadcast_router.get(
+    "/{broadcast_id}/recipients", response_model=BroadcastRecipientListResponse
+)
+async def get_broadcast_recipients(
+    broadcast_id: int,
+    service: Annotated[SMSBroadcastService, Depends(get_broadcast_service)],
+    current_user: Annotated[CurrentUser, Depends(require_roles(settings.sms_broadcast_roles))],
+    status: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+):
+    await service.get_broadcast(broadcast_id)
+    result = await service.get_recipients(
+        broadcast_id, recipient_status=status, limit=min(limit, 1000), offset=offset
+    )
+    return BroadcastRecipientListResponse(**result)
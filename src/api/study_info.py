@@ -8,7 +8,7 @@ from src.schemas.study_info import (
     StudyInfoBase,
 )
 from src.core.db import get_db
-from sharq_models.models import User # type: ignore
+from src.schemas.user import CurrentUser
 from src.utils.auth import require_roles
 from typing import Annotated
 
@@ -23,7 +23,7 @@ def get_service_crud(db: AsyncSession = Depends(get_db)):
 async def create_application(
     study_info: StudyInfoCreateRequest,
     service: Annotated[StudyInfoCrud, Depends(get_service_crud)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ):
     return await service.create_application(
         study_info=StudyInfoCreate(
@@ -36,7 +36,7 @@ async def create_application(
 @application_router.get("", tags=["Application"])
 async def get_user_study_info(
     service: Annotated[StudyInfoCrud, Depends(get_service_crud)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ) -> StudyInfoResponse:
     return await service.get_application_by_user_id(user_id=current_user.id)
 
@@ -45,7 +45,7 @@ async def get_user_study_info(
 async def update_application(
     application: StudyInfoBase,
     service: Annotated[StudyInfoCrud, Depends(get_service_crud)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ):
     return await service.update_application(
         application=application,
@@ -91,6 +91,6 @@ async def get_education_type_list(
 @application_router.get("/application_status" , tags=["Application"])
 async def get_status(
     service: Annotated[StudyInfoCrud, Depends(get_service_crud)],
-    current_user: Annotated[User, Depends(require_roles(["user"]))],
+    current_user: Annotated[CurrentUser, Depends(require_roles(["user"]))],
 ):
     return await service.get_user_application_status(user_id=current_user.id)
@@ -1,9 +1,20 @@
+from typing import Optional
+
 import httpx
 
+from src.utils.circuit_breaker import CircuitBreaker
+
 
 class BaseClient:
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        circuit: Optional[CircuitBreaker] = None,
+        timeout: float = 15.0,
+    ):
         self.base_url = base_url
+        self.circuit = circuit
+        self.timeout = timeout
 
     @property
     def default_headers(self):
@@ -15,6 +26,20 @@ class BaseClient:
         if not headers:
             headers = self.default_headers
 
-        async with httpx.AsyncClient() as client:
-            response = await client.request(method, url, headers=headers, **kwargs)
-            return response
+        if self.circuit:
+            self.circuit.before_call()
+
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.request(method, url, headers=headers, **kwargs)
+        except httpx.TransportError:
+            if self.circuit:
+                self.circuit.record_failure()
+            raise
+
+        if self.circuit:
+            if response.status_code >= 500:
+                self.circuit.record_failure()
+            else:
+                self.circuit.record_success()
+        return response
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import httpx
+import jwt
+
+from src.core.config import settings
+from src.utils.circuit_breaker import UPSTREAMS, get_circuit_breaker
+
+
+logger = logging.getLogger(__name__)
+
+
+class EskizAuthError(Exception):
+    """Eskiz did not give us a bearer token; ``unreachable`` when it did not answer at all"""
+
+    def __init__(self, message: str, unreachable: bool = False):
+        super().__init__(message)
+        self.unreachable = unreachable
+
+
+class EskizTokenManager:
+    """
+    Per-worker cache of the Eskiz bearer token.
+
+    The token is reused until ``refresh_margin`` seconds before the ``exp`` in
+    its JWT payload. Concurrent callers share a single ``/auth/login`` call.
+    """
+
+    def __init__(self, refresh_margin: float = 3600, fallback_ttl: float = 86400):
+        self.refresh_margin = refresh_margin
+        self.fallback_ttl = fallback_ttl
+        self.circuit = get_circuit_breaker(UPSTREAMS["SMS"])
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_valid(self) -> bool:
+        return self._token is not None and time.time() < self._expires_at - self.refresh_margin
+
+    async def get_token(self, stale_token: Optional[str] = None) -> str:
+        """
+        Return a usable token. Pass the token Eskiz rejected with 401 as
+        ``stale_token`` to force a refresh.
+        """
+        if self._is_valid() and self._token != stale_token:
+            return self._token
+
+        async with self._lock:
+            # Another sender may have refreshed the token while we waited
+            if self._is_valid() and self._token != stale_token:
+                return self._token
+
+            self._token = await self._login()
+            self._expires_at = self._read_expiry(self._token)
+            return self._token
+
+    def _read_expiry(self, token: str) -> float:
+        try:
+            payload = jwt.decode(token, options={"verify_signature": False})
+            return float(payload["exp"])
+        except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+            logger.warning("Eskiz token has no readable exp, caching it with the fallback TTL")
+            return time.time() + self.fallback_ttl
+
+    async def _login(self) -> str:
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.post(
+                    f"{settings.sms_base_url}/auth/login",
+                    headers={"Content-Type": "application/json"},
+                    json={"email": settings.sms_sender, "password": settings.sms_api_key},
+                )
+        except httpx.TransportError as e:
+            self.circuit.record_failure()
+            raise EskizAuthError(f"Eskiz login unreachable: {e}", unreachable=True)
+
+        # Any answer settles a half-open probe; only 5xx means Eskiz itself is failing
+        if response.status_code >= 500:
+            self.circuit.record_failure()
+            raise EskizAuthError(f"Eskiz login failed: {response.status_code}", unreachable=True)
+        self.circuit.record_success()
+
+        if response.status_code == 200:
+            return response.json().get("data").get("token")
+
+        logger.error(f"Eskiz login failed: {response.status_code}")
+        raise EskizAuthError(f"Eskiz login failed: {response.status_code}")
+
+
+eskiz_token_manager = EskizTokenManager()
@@ -1,10 +1,14 @@
 from src.clients import BaseClient
 from src.core.config import settings
+from src.utils.circuit_breaker import UPSTREAMS, get_circuit_breaker
 
 
 class PassportDataClient(BaseClient):
     def __init__(self):
-        super().__init__(settings.passport_data_base_url)
+        super().__init__(
+            settings.passport_data_base_url,
+            circuit=get_circuit_breaker(UPSTREAMS["PASSPORT"]),
+        )
         self.phone_number = settings.passport_data_username
         self.password = settings.passport_data_password
         self.token = None
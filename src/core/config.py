@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,15 +17,107 @@ class Settings(BaseSettings):
     sms_base_url: str = "https://notify.eskiz.uz/api"
     sms_sender: str
     sms_api_key: str
-    sms_callback_url: str = "https://sharquniversity.amocrm.ru/api/v4/leads/callback"
+    # Where Eskiz posts delivery reports; empty means this service's /api/sms/callback under public_base_url
+    sms_callback_url: str = ""
+    # Appended to the callback URL as ?token=...; /api/sms/callback rejects other requests
+    sms_callback_secret: str = ""
+    # Address this API is reachable at from outside, e.g. https://api.example.uz
+    public_base_url: str = ""
 
     amo_crm_base_url: str = "https://sharquniversity.amocrm.ru/api/v4"
     amo_crm_token: str
+    amo_crm_batch_window: float = 0.2
+    amo_crm_batch_size: int = 50
+    amo_crm_fields_ttl: int = 3600
+    amo_crm_fields_snapshot_path: str = ".cache/amocrm_fields.json"
+    amo_crm_pipelines_refresh_interval: int = 600
+    amo_crm_contact_index_size: int = 10000
+    # AmoCRM allows about 7 requests per second per account
+    amo_crm_rate_limit: float = 6.0
+    amo_crm_rate_burst: int = 7
+    amo_crm_max_retries: int = 5
+    amo_crm_backoff_base: float = 0.5
+    amo_crm_backoff_max: float = 30.0
+    # Shared secret AmoCRM appends to the webhook URL as ?token=...
+    amo_crm_webhook_secret: str = ""
+    amo_crm_webhook_flush_interval: float = 1.0
+    amo_crm_webhook_batch_size: int = 200
+
+    crm_outbox_batch_size: int = 50
+    crm_outbox_concurrency: int = 10
+    crm_outbox_poll_interval: float = 1.0
+    crm_outbox_lease_seconds: int = 120
+    crm_outbox_max_attempts: int = 10
+    crm_outbox_backoff_seconds: float = 5.0
+
+    sms_outbox_batch_size: int = 50
+    sms_outbox_concurrency: int = 20
+    sms_outbox_poll_interval: float = 0.5
+    sms_outbox_lease_seconds: int = 60
+    sms_outbox_max_attempts: int = 5
+    sms_outbox_backoff_seconds: float = 2.0
+
+    sms_delivery_flush_interval: float = 2.0
+    sms_delivery_batch_size: int = 500
+
+    # Eskiz batch requests per second and recipients per request for broadcasts
+    sms_broadcast_rate: float = 1.0
+    sms_broadcast_chunk_size: int = 200
+    sms_broadcast_materialize_size: int = 2000
+    sms_broadcast_poll_interval: float = 5.0
+    sms_broadcast_lease_seconds: int = 300
+    sms_broadcast_roles: List[str] = ["admin"]
+
+    sms_session_retention_days: int = 7
+    sms_sweeper_batch_size: int = 5000
+    sms_sweeper_interval: int = 3600
+    sms_partition_months_ahead: int = 2
+
+    # Per-upstream overrides, e.g. {"sms": {"failure_threshold": 3}}
+    circuit_failure_threshold: int = 5
+    circuit_recovery_timeout: float = 30.0
+    circuit_half_open_max_calls: int = 1
+    circuit_breaker_overrides: Dict[str, Dict[str, float]] = {}
 
     passport_data_base_url: str
     passport_data_username: str
     passport_data_password: str
 
+    # Shared key-value store; without it short-lived state stays in each process
+    redis_url: str = ""
+    # Process-local store instead of Redis; only correct with a single API process
+    kv_allow_memory: bool = False
+    # "postgres" keeps SMS verification sessions in sms_verification_session, "kv" in the store above.
+    # Only the sessions move: every OTP send still queues an sms_outbox row in Postgres for the
+    # dispatch worker, and a resend reads its status from there
+    sms_session_backend: str = "postgres"
+
+    # Header our reverse proxy sets with the client address; empty to use the socket peer
+    forwarded_ip_header: str = "X-Forwarded-For"
+    otp_rate_phone_limit: int = 5
+    otp_rate_phone_window: int = 3600
+    otp_rate_ip_limit: int = 20
+    otp_rate_ip_window: int = 3600
+
+    # Failed logins allowed before a lockout of login_base_lockout seconds, doubling per failure
+    login_phone_free_attempts: int = 5
+    login_ip_free_attempts: int = 50
+    login_base_lockout: float = 30.0
+    login_max_lockout: float = 3600.0
+    login_failure_window: int = 86400
+
+    # Seconds a user loaded for get_current_user is reused; bounds how long a role change takes effect
+    auth_principal_ttl: int = 60
+
+    # Registered phones kept in memory for existence checks; past this the index is partial
+    phone_index_max_size: int = 500000
+    # Seconds an index answer is trusted; other workers' registrations show up within this
+    phone_index_ttl: int = 300
+
+    # Threads for bcrypt and how many more calls may wait before logins get a 503
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+
     # Documentation authentication
     docs_username: str = "admin"
     docs_password: str = "admin123"
@@ -39,6 +133,17 @@ class Settings(BaseSettings):
         return {
             "base_url": self.amo_crm_base_url,
             "token": self.amo_crm_token,
+            "batch_window": self.amo_crm_batch_window,
+            "batch_size": self.amo_crm_batch_size,
+            "fields_ttl": self.amo_crm_fields_ttl,
+            "fields_snapshot_path": self.amo_crm_fields_snapshot_path,
+            "pipelines_refresh_interval": self.amo_crm_pipelines_refresh_interval,
+            "contact_index_size": self.amo_crm_contact_index_size,
+            "rate_limit": self.amo_crm_rate_limit,
+            "rate_burst": self.amo_crm_rate_burst,
+            "max_retries": self.amo_crm_max_retries,
+            "backoff_base": self.amo_crm_backoff_base,
+            "backoff_max": self.amo_crm_backoff_max,
             "first_create_pipline_id": 9646446,
             "first_create_status_id": 76961026,
             "lead_accepted_pipline_id": 9646446,
@@ -0,0 +1,192 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+
+
+class KVStore(ABC):
+    """Small key-value interface with native expiry, shared by short-lived state"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[float] = None): ...
+
+    @abstractmethod
+    async def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set ``key`` only if it does not exist; ``True`` if this call set it"""
+
+    @abstractmethod
+    async def delete(self, *keys: str): ...
+
+    @abstractmethod
+    async def pop(self, key: str) -> Optional[str]:
+        """Atomically read and delete ``key``"""
+
+    @abstractmethod
+    async def incr(self, key: str, ttl: Optional[float] = None, amount: int = 1) -> int:
+        """Atomically add ``amount``; ``ttl`` is applied when the counter is created"""
+
+    @abstractmethod
+    async def ttl(self, key: str) -> Optional[float]:
+        """Seconds until ``key`` expires, ``None`` if it is missing or never expires"""
+
+    async def close(self):
+        pass
+
+
+class MemoryKVStore(KVStore):
+    """Process-local store for tests and single-process deployments"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._purge_at = 1024
+
+    def _alive(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._alive(key)
+        return entry[0] if entry else None
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [
+            key
+            for key, (_, expires_at) in self._data.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in expired:
+            del self._data[key]
+        self._purge_at = max(1024, len(self._data) * 2)
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (str(value), expires_at)
+        # Keys nobody reads again would otherwise never leave memory
+        if len(self._data) >= self._purge_at:
+            self._purge_expired()
+
+    async def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        if self._alive(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def pop(self, key: str) -> Optional[str]:
+        entry = self._alive(key)
+        if entry is None:
+            return None
+        del self._data[key]
+        return entry[0]
+
+    async def incr(self, key: str, ttl: Optional[float] = None, amount: int = 1) -> int:
+        entry = self._alive(key)
+        if entry is None:
+            await self.set(key, str(amount), ttl)
+            return amount
+        value = int(entry[0]) + amount
+        self._data[key] = (str(value), entry[1])
+        return value
+
+    async def ttl(self, key: str) -> Optional[float]:
+        entry = self._alive(key)
+        if entry is None or entry[1] is None:
+            return None
+        return entry[1] - time.monotonic()
+
+
+# INCR and EXPIRE must run together, or a crash between them leaves a counter that never expires
+_INCR_WITH_TTL = """
+local value = redis.call('INCRBY', KEYS[1], ARGV[2])
+if value == tonumber(ARGV[2]) and tonumber(ARGV[1]) > 0 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+return value
+"""
+
+
+class RedisKVStore(KVStore):
+    """Store shared by every API and worker process, backed by Redis"""
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis  # type: ignore
+        except ImportError as e:
+            raise RuntimeError("REDIS_URL is set but the redis package is not installed") from e
+
+        self.client = redis.from_url(url, decode_responses=True)
+        self._incr_with_ttl = self.client.register_script(_INCR_WITH_TTL)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        px = int(ttl * 1000) if ttl is not None else None
+        await self.client.set(key, value, px=px)
+
+    async def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        px = int(ttl * 1000) if ttl is not None else None
+        return bool(await self.client.set(key, value, px=px, nx=True))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*keys)
+
+    async def pop(self, key: str) -> Optional[str]:
+        return await self.client.getdel(key)
+
+    async def incr(self, key: str, ttl: Optional[float] = None, amount: int = 1) -> int:
+        px = int(ttl * 1000) if ttl is not None else 0
+        return int(await self._incr_with_ttl(keys=[key], args=[px, amount]))
+
+    async def ttl(self, key: str) -> Optional[float]:
+        pttl = await self.client.pttl(key)
+        return pttl / 1000 if pttl >= 0 else None
+
+    async def close(self):
+        await self.client.aclose()
+
+
+_kv_store: Optional[KVStore] = None
+
+
+def get_kv_store() -> KVStore:
+    """
+    The store shared by every worker, backed by ``redis_url``.
+
+    Rate limits, the principal cache and OTP sessions are only correct when
+    all workers see the same keys, so without Redis this refuses to start
+    unless ``kv_allow_memory`` opts into a process-local store for a single
+    process or development.
+    """
+    global _kv_store
+    if _kv_store is None:
+        if settings.redis_url:
+            _kv_store = RedisKVStore(settings.redis_url)
+        elif settings.kv_allow_memory:
+            _kv_store = MemoryKVStore()
+        else:
+            raise RuntimeError(
+                "REDIS_URL is not set; set it, or KV_ALLOW_MEMORY=true for a single process"
+            )
+    return _kv_store
+
+
+async def close_kv_store():
+    global _kv_store
+    if _kv_store is not None:
+        await _kv_store.close()
+        _kv_store = None
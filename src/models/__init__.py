@@ -0,0 +1,15 @@
+__all__ = (
+    "CRMOutboxEvent",
+    "SMSOutboxMessage",
+    "SMSDeliveryReport",
+    "SMSBroadcast",
+    "SMSBroadcastRecipient",
+    "UserPasswordChange",
+)
+
+
+from .outbox import CRMOutboxEvent
+from .sms_outbox import SMSOutboxMessage
+from .sms_delivery import SMSDeliveryReport
+from .sms_broadcast import SMSBroadcast, SMSBroadcastRecipient
+from .user_password_change import UserPasswordChange
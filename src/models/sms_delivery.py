@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.db import Base
+
+
+class SMSDeliveryReport(Base):
+    """Delivery status Eskiz reported for a sent SMS"""
+
+    __tablename__ = "sms_delivery_reports"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    message_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    session_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    provider_request_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    phone_number: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    operator: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    status_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        Index("ix_sms_delivery_reports_message_id", "message_id"),
+        Index("ix_sms_delivery_reports_received_at", "received_at"),
+    )
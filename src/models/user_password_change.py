@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.db import Base
+
+
+class UserPasswordChange(Base):
+    """When a user last reset their password; tokens issued before it are rejected"""
+
+    __tablename__ = "user_password_changes"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    changed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
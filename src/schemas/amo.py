@@ -8,3 +8,10 @@ class AMOCrmLead(BaseModel):
     contact_data: dict
     lead_data: dict
     phone_number: str
+
+
+class LeadStatusEvent(BaseModel):
+    lead_id: int
+    status_id: int
+    pipeline_id: int
+    updated_at: int = 0
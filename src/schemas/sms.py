@@ -8,6 +8,7 @@ class SendVerificationCodeRequest(BaseModel):
 
 
 class ResetPasswordRequest(BaseModel):
+    phone_number: str
     verification_code: str
     new_password: str
 
@@ -16,6 +17,7 @@ class SendVerificationCodeResponse(BaseModel):
     message: str
     phone_number: str
     expires_at: datetime
+    send_status: Optional[str] = None
 
 
 class VerifyCodeRequest(BaseModel):
@@ -32,7 +34,6 @@ class RegisterWithVerificationRequest(BaseModel):
     phone_number: str
     password: str
     verification_code: str
-    role_id: Optional[int] = None
 
 
 class RegisterWithVerificationResponse(BaseModel):
@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+
+class BroadcastFilter(BaseModel):
+    study_direction_id: Optional[int] = None
+    study_form_id: Optional[int] = None
+    study_type_id: Optional[int] = None
+    # One of LEAD_STAGES, e.g. "get_contract"
+    lead_stage: Optional[str] = None
+    has_application: Optional[bool] = None
+    has_contract: Optional[bool] = None
+
+
+class BroadcastCreateRequest(BaseModel):
+    title: str = Field(max_length=255)
+    message: str = Field(min_length=1, max_length=918)
+    filters: BroadcastFilter = BroadcastFilter()
+
+
+class BroadcastResponse(BaseModel):
+    id: int
+    title: str
+    message: str
+    filters: dict
+    status: str
+    total: int
+    sent: int
+    failed: int
+    pending: int
+    collecting: bool
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class BroadcastRecipientResponse(BaseModel):
+    user_id: int
+    phone_number: str
+    status: str
+    error: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+
+class BroadcastRecipientListResponse(BaseModel):
+    total: int
+    items: List[BroadcastRecipientResponse]
@@ -16,3 +16,14 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = None
     scopes: list[str] = []
+
+
+class CurrentUser(BaseModel):
+    """What protected endpoints need about the caller, cached between requests"""
+
+    id: int
+    phone_number: str
+    role_id: Optional[int] = None
+    role_name: Optional[str] = None
+    # Tokens issued before this UNIX time are no longer accepted
+    password_changed_at: float = 0.0
@@ -1,16 +1,27 @@
+import asyncio
 import http
-import requests
+import httpx
 import logging
-from typing import Dict, List, Optional, Any, Union, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Union, Tuple, TypeVar
 from dataclasses import dataclass
 from enum import Enum
 
+from sqlalchemy import select
 from sharq_models import PassportData #type: ignore
+from sharq_models.models import AMOCrmLead #type: ignore
+from src.core.db import AsyncSessionLocal
+from src.utils.circuit_breaker import UPSTREAMS, get_circuit_breaker
+from src.utils.throttle import TokenBucket, backoff_delay, parse_retry_after
+from src.utils.utils import normalize_phone, phone_variants
+from src.service.amo_batch import AmoCRMBatcher, AMO_BATCH_LIMIT
+from src.service.amo_cache import ContactIndex, CustomFieldSchemaCache, PipelineCache
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class Gender(Enum):
     MALE = "1"
@@ -94,6 +105,17 @@ class AmoCRMConfig:
     def __init__(self, config_data: Dict[str, Any]):
         self.base_api = config_data.get("base_url")
         self.token = config_data.get("token")
+        self.batch_window = config_data.get("batch_window", 0.2)
+        self.batch_size = config_data.get("batch_size", AMO_BATCH_LIMIT)
+        self.fields_ttl = config_data.get("fields_ttl", 3600)
+        self.fields_snapshot_path = config_data.get("fields_snapshot_path")
+        self.pipelines_refresh_interval = config_data.get("pipelines_refresh_interval", 600)
+        self.contact_index_size = config_data.get("contact_index_size", 10000)
+        self.rate_limit = config_data.get("rate_limit", 6.0)
+        self.rate_burst = config_data.get("rate_burst", 7)
+        self.max_retries = config_data.get("max_retries", 5)
+        self.backoff_base = config_data.get("backoff_base", 0.5)
+        self.backoff_max = config_data.get("backoff_max", 30.0)
 
         self.pipelines = {
             PIPELINE_TYPES["FIRST_CREATE"]: {
@@ -121,7 +143,22 @@ class AmoCRMConfig:
 
 
 class AmoCRMException(Exception):
-    pass
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        response_text: str = "",
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_text = response_text
+
+    @property
+    def is_unknown_field_error(self) -> bool:
+        return (
+            self.status_code == http.HTTPStatus.BAD_REQUEST
+            and "custom_fields_values" in self.response_text
+        )
 
 
 class FieldBuilder:
@@ -151,13 +188,63 @@ class FieldBuilder:
         return fields
 
 
+async def find_local_contact_id(phone: str) -> Optional[int]:
+    """Look the contact up in our own ``AMOCrmLead`` rows"""
+    async with AsyncSessionLocal() as session:
+        stmt = (
+            select(AMOCrmLead.contact_id)
+            .where(AMOCrmLead.phone_number.in_(phone_variants(phone)))
+            .limit(1)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().first()
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the connection pool shared by every AmoCRM call in this worker"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 class AmoCRMService:
-    def __init__(self, config: AmoCRMConfig):
+    def __init__(self, config: AmoCRMConfig, client: Optional[httpx.AsyncClient] = None):
         self.config = config
-        self._contact_fields_cache: Optional[Dict[str, int]] = None
-        self._lead_fields_cache: Optional[Dict[str, int]] = None
+        self._client = client
+        self.rate_limiter = TokenBucket(rate=config.rate_limit, capacity=config.rate_burst)
+        self.batcher = AmoCRMBatcher(
+            self._make_request,
+            window=config.batch_window,
+            max_batch=config.batch_size,
+        )
+        self.field_schema = CustomFieldSchemaCache(
+            ttl=config.fields_ttl, snapshot_path=config.fields_snapshot_path
+        )
+        self.pipelines = PipelineCache()
+        self.circuit = get_circuit_breaker(UPSTREAMS["AMOCRM"])
+        self.contact_index = ContactIndex(
+            lookup=find_local_contact_id, max_size=config.contact_index_size
+        )
 
-    def _make_request(
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_http_client()
+
+    async def _make_request(
         self,
         method: str,
         endpoint: str,
@@ -166,33 +253,141 @@ class AmoCRMService:
     ) -> Dict[str, Any]:
         url = f"{self.config.base_api}/{endpoint}"
 
-        try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=self.config.headers,
-                params=params,
-                json=json_data,
-            )
-            response.raise_for_status()
+        attempt = 0
+        while True:
+            # Fails fast with CircuitOpenError so callers can defer instead of waiting
+            self.circuit.before_call()
+            await self.rate_limiter.acquire()
+            try:
+                response = await self.client.request(
+                    method=method,
+                    url=url,
+                    headers=self.config.headers,
+                    params=params,
+                    json=json_data,
+                )
+                self._record_outcome(response=response)
+                response.raise_for_status()
+
+                if response.status_code == http.HTTPStatus.NO_CONTENT:
+                    return {}
+
+                return response.json()
+
+            except httpx.HTTPError as e:
+                if isinstance(e, httpx.TransportError):
+                    self._record_outcome(error=e)
+                if attempt >= self.config.max_retries or not self._is_retryable(e, method):
+                    self._handle_request_error(e, method, endpoint)
+
+                retry_after = None
+                if isinstance(e, httpx.HTTPStatusError):
+                    retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                delay = backoff_delay(
+                    attempt,
+                    base=self.config.backoff_base,
+                    cap=self.config.backoff_max,
+                    retry_after=retry_after,
+                )
+                if self._is_throttled(e):
+                    # The whole account is over quota, so hold back every caller
+                    self.rate_limiter.pause(delay)
 
-            if response.status_code == http.HTTPStatus.NO_CONTENT:
-                return {}
+                attempt += 1
+                logger.warning(
+                    f"Retrying {method} {endpoint} in {delay:.2f}s "
+                    f"(attempt {attempt}/{self.config.max_retries}): {e}"
+                )
+                await asyncio.sleep(delay)
 
-            return response.json()
+    def _record_outcome(
+        self,
+        response: Optional[httpx.Response] = None,
+        error: Optional[httpx.TransportError] = None,
+    ):
+        # Client errors and 429 mean AmoCRM is up, only outages trip the breaker
+        if error is not None or response.status_code >= 500:
+            self.circuit.record_failure()
+        else:
+            self.circuit.record_success()
 
-        except requests.exceptions.RequestException as e:
-            self._handle_request_error(e, method, endpoint)
+    @staticmethod
+    def _is_throttled(error: httpx.HTTPError) -> bool:
+        return (
+            isinstance(error, httpx.HTTPStatusError)
+            and error.response.status_code == http.HTTPStatus.TOO_MANY_REQUESTS
+        )
+
+    def _is_retryable(self, error: httpx.HTTPError, method: str) -> bool:
+        if self._is_throttled(error):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            # A POST that reached AmoCRM may have created the entity already
+            return error.response.status_code >= 500 and method != "POST"
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        return isinstance(error, httpx.TransportError) and method != "POST"
 
     def _handle_request_error(
         self, error: Exception, method: str, endpoint: str
     ) -> None:
         error_msg = f"API request failed for {method} {endpoint}: {error}"
-        if hasattr(error, "response") and error.response is not None:
-            error_msg += f" | Status: {error.response.status_code} | Response: {error.response.text}"
+        status_code, response_text = None, ""
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code, response_text = error.response.status_code, error.response.text
+            error_msg += f" | Status: {status_code} | Response: {response_text}"
 
         logger.error(error_msg)
-        raise AmoCRMException(error_msg)
+        raise AmoCRMException(error_msg, status_code=status_code, response_text=response_text)
+
+    async def warm_up(self):
+        """Load custom-field maps and pipeline metadata before serving requests"""
+        self.field_schema.load_snapshot()
+        await asyncio.gather(
+            self._get_contact_fields(),
+            self._get_lead_fields(),
+            self.refresh_pipelines(),
+        )
+        self._check_configured_pipelines()
+        self.pipelines.start_refresh(
+            self._fetch_pipelines, self.config.pipelines_refresh_interval
+        )
+
+    async def _fetch_pipelines(self) -> List[Dict[str, Any]]:
+        data = await self._make_request("GET", "leads/pipelines")
+        return self._get_embedded_data(data, "pipelines")
+
+    async def refresh_pipelines(self):
+        try:
+            self.pipelines.load(await self._fetch_pipelines())
+        except AmoCRMException:
+            logger.error("Failed to load AmoCRM pipelines")
+
+    def _check_configured_pipelines(self):
+        if not self.pipelines.is_loaded:
+            return
+
+        configured = [
+            (pipeline["pipeline_id"], pipeline["status_id"])
+            for pipeline in self.config.pipelines.values()
+        ]
+        for pipeline_id, status_id in self.pipelines.missing(configured):
+            logger.error(
+                f"Configured AmoCRM status {status_id} does not exist in pipeline {pipeline_id}"
+            )
+
+    async def _with_field_schema_retry(
+        self, entity: str, operation: Callable[[], Awaitable[T]]
+    ) -> T:
+        try:
+            return await operation()
+        except AmoCRMException as e:
+            if not e.is_unknown_field_error:
+                raise
+            # A field was renamed or recreated in AmoCRM; rebuild the payload once
+            logger.warning(f"AmoCRM rejected {entity} custom fields, refreshing schema")
+            self.field_schema.invalidate(entity)
+            return await operation()
 
     def _get_embedded_data(
         self, data: Dict[str, Any], entity_type: str
@@ -205,73 +400,77 @@ class AmoCRMService:
         entities = self._get_embedded_data(data, entity_type)
         return entities[0] if entities else None
 
-    def get_status_by_id(
+    async def get_status_by_id(
         self, pipeline_id: int, status_id: int
     ) -> Optional[Dict[str, Any]]:
-        try:
-            data = self._make_request("GET", f"leads/pipelines/{pipeline_id}")
-            statuses = self._get_embedded_data(data, "statuses")
+        # Only the very first lookup of a worker that failed to warm up hits the network
+        if not self.pipelines.is_loaded:
+            await self.refresh_pipelines()
 
-            status = next((item for item in statuses if item["id"] == status_id), None)
+        status = self.pipelines.get_status(pipeline_id, status_id)
 
-            if not status:
-                logger.warning(
-                    f"Status ID {status_id} not found in pipeline {pipeline_id}"
-                )
-                return None
-
-            return status
-
-        except AmoCRMException:
-            logger.error(
-                f"Failed to get status for pipeline {pipeline_id}, status {status_id}"
+        if not status:
+            logger.warning(
+                f"Status ID {status_id} not found in pipeline {pipeline_id}"
             )
             return None
 
-    def search_contact(self, phone: str) -> Optional[Dict[str, Any]]:
+        return status
+
+    async def search_contact(self, phone: str) -> Optional[Dict[str, Any]]:
         try:
-            data = self._make_request("GET", "contacts", params={"query": phone})
+            data = await self._make_request(
+                "GET", "contacts", params={"query": normalize_phone(phone)}
+            )
             contact = self._get_first_entity(data, "contacts")
 
             if not contact:
                 logger.info(f"Contact not found for phone: {phone}")
                 return None
 
+            self.contact_index.remember(normalize_phone(phone), contact["id"])
             return contact
 
         except AmoCRMException:
             logger.error(f"Failed to search contact with phone: {phone}")
             return None
 
-    def _get_cached_fields(self, endpoint: str, cache_attr: str) -> Dict[str, int]:
-        cache = getattr(self, cache_attr)
-        if cache is None:
-            try:
-                data = self._make_request("GET", endpoint)
-                fields = self._get_embedded_data(data, "custom_fields")
+    async def resolve_contact_id(self, phone: str) -> Optional[int]:
+        """Find the contact for a phone locally, searching AmoCRM only on a miss"""
+        if not phone:
+            return None
 
-                cache = {field["name"].lower(): field["id"] for field in fields}
-                setattr(self, cache_attr, cache)
+        contact_id = await self.contact_index.resolve(normalize_phone(phone))
+        if contact_id is not None:
+            return contact_id
 
-            except AmoCRMException:
-                logger.error(f"Failed to get {endpoint} custom fields")
-                cache = {}
-                setattr(self, cache_attr, cache)
+        contact = await self.search_contact(phone)
+        return contact["id"] if contact else None
 
-        return cache
+    async def _fetch_custom_fields(self, entity: str) -> Dict[str, int]:
+        cache = {}
+        page = 1
+        while True:
+            data = await self._make_request(
+                "GET", f"{entity}/custom_fields", params={"limit": 250, "page": page}
+            )
+            fields = self._get_embedded_data(data, "custom_fields")
+            cache.update({field["name"].lower(): field["id"] for field in fields})
 
-    def _get_contact_fields(self) -> Dict[str, int]:
-        return self._get_cached_fields(
-            "contacts/custom_fields", "_contact_fields_cache"
-        )
+            if not data.get("_links", {}).get("next"):
+                return cache
+            page += 1
 
-    def _get_lead_fields(self) -> Dict[str, int]:
-        return self._get_cached_fields("leads/custom_fields", "_lead_fields_cache")
+    async def _get_contact_fields(self) -> Dict[str, int]:
+        return await self.field_schema.get("contacts", self._fetch_custom_fields)
 
-    def _build_contact_fields_values(
+    async def _get_lead_fields(self) -> Dict[str, int]:
+        return await self.field_schema.get("leads", self._fetch_custom_fields)
+
+    async def _build_contact_fields_values(
         self, contact_data: ContactData
     ) -> List[Dict[str, Any]]:
-        fields = self._get_contact_fields()
+        fields = await self._get_contact_fields()
 
         field_mappings = [
             ("phone", CONTACT_FIELD_MAPPINGS["phone"], contact_data.phone),
@@ -333,8 +532,8 @@ class AmoCRMService:
             return f"0000-00-00T00:00:00+05:00"
         return f"{date_str}T00:00:00+05:00"
 
-    def _build_deal_fields_values(self, deal_data: DealData) -> List[Dict[str, Any]]:
-        fields = self._get_lead_fields()
+    async def _build_deal_fields_values(self, deal_data: DealData) -> List[Dict[str, Any]]:
+        fields = await self._get_lead_fields()
 
         field_mappings = [
             (
@@ -383,19 +582,20 @@ class AmoCRMService:
             field_mappings, DEAL_FIELD_MAPPINGS
         )
 
-    def _create_or_update_contact(self, contact_data: ContactData) -> Optional[int]:
-        existing_contact = self.search_contact(contact_data.phone)
-        custom_fields_values = self._build_contact_fields_values(contact_data)
+    async def _create_or_update_contact(self, contact_data: ContactData) -> Optional[int]:
+        contact_id = await self.resolve_contact_id(contact_data.phone)
+        custom_fields_values = await self._build_contact_fields_values(contact_data)
         contact_name = f"{contact_data.last_name} {contact_data.first_name}"
 
-        if existing_contact:
-            contact_id = existing_contact["id"]
+        if contact_id:
             logger.info(f"Updating existing contact: {contact_id}")
 
-            self._make_request(
+            await self.batcher.submit(
                 "PATCH",
-                f"contacts/{contact_id}",
-                json_data={
+                "contacts",
+                "contacts",
+                {
+                    "id": contact_id,
                     "name": contact_name,
                     "custom_fields_values": custom_fields_values,
                 },
@@ -405,51 +605,56 @@ class AmoCRMService:
         else:
             logger.info("Creating new contact")
 
-            data = self._make_request(
+            created_contact = await self.batcher.submit(
                 "POST",
                 "contacts",
-                json_data=[
-                    {
-                        "name": contact_name,
-                        "custom_fields_values": custom_fields_values,
-                    }
-                ],
+                "contacts",
+                {
+                    "name": contact_name,
+                    "custom_fields_values": custom_fields_values,
+                },
             )
-
-            created_contact = self._get_first_entity(data, "contacts")
             contact_id = created_contact.get("id") if created_contact else None
+            if contact_id:
+                self.contact_index.remember(normalize_phone(contact_data.phone), contact_id)
 
             logger.info(f"Contact created successfully: {contact_id}")
             return contact_id
 
-    def create_contact(self, contact_data: ContactData) -> Optional[int]:
+    async def create_contact(self, contact_data: ContactData) -> Optional[int]:
         try:
-            return self._create_or_update_contact(contact_data)
+            return await self._with_field_schema_retry(
+                "contacts", lambda: self._create_or_update_contact(contact_data)
+            )
         except AmoCRMException as e:
             logger.error(f"Failed to create/update contact: {e}")
             return None
 
-    def _create_deal_with_pipeline(
+    async def _build_deal_request(
         self, deal_data: DealData, pipeline_type: str, tags: List[str]
-    ) -> Optional[Dict[str, Any]]:
-        custom_fields_values = self._build_deal_fields_values(deal_data)
+    ) -> Dict[str, Any]:
+        custom_fields_values = await self._build_deal_fields_values(deal_data)
         pipeline_config = self.config.pipelines[pipeline_type]
 
-        deal_request_data = [
-            {
-                "name": deal_data.name,
-                "pipeline_id": pipeline_config["pipeline_id"],
-                "status_id": pipeline_config["status_id"],
-                "_embedded": {
-                    "contacts": [{"id": deal_data.contact_id}],
-                    "tags": [{"name": tag} for tag in tags],
-                },
-                "custom_fields_values": custom_fields_values,
-            }
-        ]
+        return {
+            "name": deal_data.name,
+            "pipeline_id": pipeline_config["pipeline_id"],
+            "status_id": pipeline_config["status_id"],
+            "_embedded": {
+                "contacts": [{"id": deal_data.contact_id}],
+                "tags": [{"name": tag} for tag in tags],
+            },
+            "custom_fields_values": custom_fields_values,
+        }
 
-        data = self._make_request("POST", "leads", json_data=deal_request_data)
-        created_deal = self._get_first_entity(data, "leads")
+    async def _create_deal_with_pipeline(
+        self, deal_data: DealData, pipeline_type: str, tags: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        deal_request_data = await self._build_deal_request(deal_data, pipeline_type, tags)
+
+        created_deal = await self.batcher.submit(
+            "POST", "leads", "leads", deal_request_data
+        )
 
         if created_deal:
             deal_id = created_deal.get("id")
@@ -457,23 +662,28 @@ class AmoCRMService:
 
         return created_deal
 
-    def create_deal(self, deal_data: DealData) -> Optional[Dict[str, Any]]:
+    async def create_deal(self, deal_data: DealData) -> Optional[Dict[str, Any]]:
         try:
-            return self._create_deal_with_pipeline(
-                deal_data, PIPELINE_TYPES["FIRST_CREATE"], ["Qabul sayt"]
+            return await self._with_field_schema_retry(
+                "leads",
+                lambda: self._create_deal_with_pipeline(
+                    deal_data, PIPELINE_TYPES["FIRST_CREATE"], ["Qabul sayt"]
+                ),
             )
         except AmoCRMException as e:
             logger.error(f"Failed to create deal: {e}")
             return None
 
-    def update_lead_status(
+    async def update_lead_status(
         self, pipeline_id: int, status_id: int, lead_id: int
     ) -> Optional[Dict[str, Any]]:
         try:
-            data = self._make_request(
+            data = await self.batcher.submit(
                 "PATCH",
-                f"leads/{lead_id}",
-                json_data={
+                "leads",
+                "leads",
+                {
+                    "id": int(lead_id),
                     "pipeline_id": int(pipeline_id),
                     "status_id": int(status_id),
                 },
@@ -486,57 +696,85 @@ class AmoCRMService:
             logger.error(f"Failed to update lead status: {e}")
             return None
 
-    def _update_lead_with_pipeline(self, lead_id: int, pipeline_type: str) -> bool:
+    async def _update_lead_with_pipeline(self, lead_id: int, pipeline_type: str) -> bool:
         pipeline_config = self.config.pipelines[pipeline_type]
-        result = self.update_lead_status(
+        result = await self.update_lead_status(
             pipeline_config["pipeline_id"], pipeline_config["status_id"], lead_id
         )
         return result is not None
     
-    def move_lead_to_get_contact(self, lead_id: int) -> bool:
-        return self._update_lead_with_pipeline(lead_id, PIPELINE_TYPES["GET_CONTRACT"])
+    async def move_lead_to_get_contact(self, lead_id: int) -> bool:
+        return await self._update_lead_with_pipeline(lead_id, PIPELINE_TYPES["GET_CONTRACT"])
 
-    def accept_lead(self, lead_id: int) -> bool:
-        return self._update_lead_with_pipeline(lead_id, PIPELINE_TYPES["LEAD_ACCEPTED"])
+    async def accept_lead(self, lead_id: int) -> bool:
+        return await self._update_lead_with_pipeline(lead_id, PIPELINE_TYPES["LEAD_ACCEPTED"])
 
-    def reject_lead(self, lead_id: int) -> bool:
-        return self._update_lead_with_pipeline(lead_id, PIPELINE_TYPES["LEAD_REJECTED"])
+    async def reject_lead(self, lead_id: int) -> bool:
+        return await self._update_lead_with_pipeline(lead_id, PIPELINE_TYPES["LEAD_REJECTED"])
 
-    def _create_initial_contact(self, phone: str) -> Optional[int]:
-        existing_contact = self.search_contact(phone)
+    def _initial_contact_payload(self, phone: str) -> Dict[str, Any]:
+        return {
+            "name": f"Unknown User ({phone})",
+            "custom_fields_values": [
+                {"field_code": "PHONE", "values": [{"value": phone}]}
+            ],
+        }
 
-        if existing_contact:
-            contact_id = existing_contact["id"]
-            logger.info(f"Contact already exists with phone {phone}: {contact_id}")
-            return contact_id
+    async def _create_deal_with_new_contact(
+        self,
+        deal_data: DealData,
+        contact: Dict[str, Any],
+        pipeline_type: str,
+        tags: List[str],
+    ) -> Optional[Dict[str, Any]]:
+        """Create the lead and its contact with a single leads/complex request"""
+        deal_request_data = await self._build_deal_request(deal_data, pipeline_type, tags)
+        deal_request_data["_embedded"]["contacts"] = [contact]
 
-        contact_name = f"Unknown User ({phone})"
-        contact_data = [
-            {
-                "name": contact_name,
-                "custom_fields_values": [
-                    {"field_code": "PHONE", "values": [{"value": phone}]}
-                ],
-            }
-        ]
+        data = await self._make_request(
+            "POST", "leads/complex", json_data=[deal_request_data]
+        )
+        return data[0] if data else None
 
-        data = self._make_request("POST", "contacts", json_data=contact_data)
-        created_contact = self._get_first_entity(data, "contacts")
-        contact_id = created_contact.get("id") if created_contact else None
+    @staticmethod
+    def _initial_deal_name(phone: str) -> str:
+        return f"Yangi Lead - {phone}"
+
+    async def find_initial_deals(self, phone: str) -> List[Dict[str, Any]]:
+        """
+        Initial deals already in AmoCRM for ``phone``, newest first.
+
+        A create whose answer never reached us leaves one of these behind, so
+        it is looked up before creating another. Raises ``AmoCRMException``.
+        """
+        pipeline_config = self.config.pipelines[PIPELINE_TYPES["FIRST_CREATE"]]
+        data = await self._make_request(
+            "GET",
+            "leads",
+            params={
+                "query": phone,
+                "with": "contacts",
+                "filter[pipeline_id]": pipeline_config["pipeline_id"],
+                "order[id]": "desc",
+            },
+        )
 
-        logger.info(f"Initial contact created: {contact_id}")
-        return contact_id
+        deals = []
+        for lead in self._get_embedded_data(data, "leads"):
+            contacts = lead.get("_embedded", {}).get("contacts") or []
+            if lead.get("name") == self._initial_deal_name(phone) and contacts:
+                deals.append(
+                    {"contact_id": contacts[0]["id"], "deal_id": lead["id"], "is_new": False}
+                )
+        return deals
 
-    def create_initial_contact_with_phone(self, phone: str) -> Optional[Dict[str, Any]]:
+    async def create_initial_contact_with_phone(self, phone: str) -> Optional[Dict[str, Any]]:
         try:
-            contact_id = self._create_initial_contact(phone)
-            if not contact_id:
-                return None
+            contact_id = await self.resolve_contact_id(phone)
 
-            deal_name = f"Yangi Lead - {phone}"
             deal_data = DealData(
-                name=deal_name,
-                contact_id=contact_id,
+                name=self._initial_deal_name(phone),
+                contact_id=contact_id or 0,
                 edu_lang_id="",
                 edu_type="",
                 edu_form="",
@@ -546,12 +784,32 @@ class AmoCRMService:
                 certificate_link="",
                 passport_file_link="",
             )
+            tags = ["Qabul sayt - Yangi Lead"]
+
+            if contact_id:
+                logger.info(f"Contact already exists with phone {phone}: {contact_id}")
+                created_deal = await self._with_field_schema_retry(
+                    "leads",
+                    lambda: self._create_deal_with_pipeline(
+                        deal_data, PIPELINE_TYPES["FIRST_CREATE"], tags
+                    ),
+                )
+            else:
+                created_deal = await self._with_field_schema_retry(
+                    "leads",
+                    lambda: self._create_deal_with_new_contact(
+                        deal_data,
+                        self._initial_contact_payload(phone),
+                        PIPELINE_TYPES["FIRST_CREATE"],
+                        tags,
+                    ),
+                )
+                contact_id = created_deal.get("contact_id") if created_deal else None
+                if contact_id:
+                    self.contact_index.remember(normalize_phone(phone), contact_id)
+                    logger.info(f"Initial contact created: {contact_id}")
 
-            created_deal = self._create_deal_with_pipeline(
-                deal_data, PIPELINE_TYPES["FIRST_CREATE"], ["Qabul sayt - Yangi Lead"]
-            )
-
-            if created_deal:
+            if created_deal and contact_id:
                 deal_id = created_deal.get("id")
                 logger.info(f"Initial deal created: {deal_id}")
 
@@ -565,31 +823,45 @@ class AmoCRMService:
             )
             return None
 
-    def update_lead_with_passport_data(
+    async def _patch_contact_with_passport_data(
+        self, contact_id: int, contact_data: ContactData
+    ) -> Optional[Dict[str, Any]]:
+        custom_fields_values = await self._build_contact_fields_values(contact_data)
+        contact_name = f"{contact_data.last_name.upper()} {contact_data.first_name.upper()}"
+
+        return await self.batcher.submit(
+            "PATCH",
+            "contacts",
+            "contacts",
+            {
+                "id": contact_id,
+                "name": contact_name,
+                "custom_fields_values": custom_fields_values,
+            },
+        )
+
+    async def update_lead_with_passport_data(
         self, deal_id: int, contact_id: int, contact_data: ContactData
     ) -> bool:
         try:
-            custom_fields_values = self._build_contact_fields_values(contact_data)
-            contact_name = f"{contact_data.last_name.upper()} {contact_data.first_name.upper()}"
-
-            self._make_request(
-                "PATCH",
-                f"contacts/{contact_id}",
-                json_data={
-                    "name": contact_name,
-                    "custom_fields_values": custom_fields_values,
-                },
-            )
-            
-            self._make_request(
-                "PATCH",
-                f"leads/{deal_id}",
-                json_data={
-                    "_embedded": {
-                        "contacts": [{"id": contact_id}],
-                        "tags": [{"name": "Qabul sayt - Passport Ma'lumotlari"}],
+            # The contact and the lead are independent entities, so patch both at once
+            await asyncio.gather(
+                self._with_field_schema_retry(
+                    "contacts",
+                    lambda: self._patch_contact_with_passport_data(contact_id, contact_data),
+                ),
+                self.batcher.submit(
+                    "PATCH",
+                    "leads",
+                    "leads",
+                    {
+                        "id": deal_id,
+                        "_embedded": {
+                            "contacts": [{"id": contact_id}],
+                            "tags": [{"name": "Qabul sayt - Passport Ma'lumotlari"}],
+                        },
                     },
-                },
+                ),
             )
 
             return True
@@ -598,25 +870,34 @@ class AmoCRMService:
             logger.error(f"Failed to update lead with passport data: {e}")
             return False
 
-    def update_contact_with_full_data(self, deal_id: int, deal_data: DealData) -> bool:
-        try:
-            custom_fields_values = self._build_deal_fields_values(deal_data)
+    async def _patch_lead_with_full_data(
+        self, deal_id: int, deal_data: DealData
+    ) -> Optional[Dict[str, Any]]:
+        custom_fields_values = await self._build_deal_fields_values(deal_data)
+        accepted = self.config.pipelines[PIPELINE_TYPES["LEAD_ACCEPTED"]]
+
+        # Moving the lead to "accepted" rides along with the field update
+        return await self.batcher.submit(
+            "PATCH",
+            "leads",
+            "leads",
+            {
+                "id": deal_id,
+                "name": deal_data.name,
+                "price": int(deal_data.price),
+                "pipeline_id": int(accepted["pipeline_id"]),
+                "status_id": int(accepted["status_id"]),
+                "custom_fields_values": custom_fields_values,
+            },
+        )
 
-            self._make_request(
-                "PATCH",
-                f"leads/{deal_id}",
-                json_data={
-                    "name": deal_data.name,
-                    "price": int(deal_data.price),
-                    "custom_fields_values": custom_fields_values,
-                },
+    async def update_contact_with_full_data(self, deal_id: int, deal_data: DealData) -> bool:
+        try:
+            await self._with_field_schema_retry(
+                "leads", lambda: self._patch_lead_with_full_data(deal_id, deal_data)
             )
 
-            logger.info(f"Deal {deal_id} updated with full data")
-
-            # Accept lead
-            if self.accept_lead(deal_id):
-                logger.info("Lead accepted successfully")
+            logger.info(f"Deal {deal_id} updated with full data and accepted")
 
             return True
 
@@ -630,18 +911,51 @@ def create_amocrm_service(config_data: Dict[str, Any]) -> AmoCRMService:
     return AmoCRMService(config)
 
 
-def create_initial_lead(
+_amocrm_service: Optional[AmoCRMService] = None
+
+
+async def init_amocrm_service(config_data: Dict[str, Any]) -> AmoCRMService:
+    """
+    Create the worker-wide service and load its field schema; call once at
+    startup of a process that talks to AmoCRM, i.e. the outbox and reconcile
+    workers. API workers only write outbox events and never need it.
+    """
+    global _amocrm_service
+    _amocrm_service = create_amocrm_service(config_data)
+    try:
+        await _amocrm_service.warm_up()
+    except Exception as e:
+        logger.error(f"Failed to warm up AmoCRM service: {e}")
+    return _amocrm_service
+
+
+def get_amocrm_service(config_data: Dict[str, Any]) -> AmoCRMService:
+    global _amocrm_service
+    if _amocrm_service is None:
+        _amocrm_service = create_amocrm_service(config_data)
+    return _amocrm_service
+
+
+async def close_amocrm_service() -> None:
+    global _amocrm_service
+    if _amocrm_service is not None:
+        await _amocrm_service.pipelines.stop_refresh()
+    _amocrm_service = None
+    await close_http_client()
+
+
+async def create_initial_lead(
     phone: str, config_data: Dict[str, Any]
 ) -> Optional[Dict[str, Any]]:
     try:
-        amo_service = create_amocrm_service(config_data)
-        return amo_service.create_initial_contact_with_phone(phone)
+        amo_service = get_amocrm_service(config_data)
+        return await amo_service.create_initial_contact_with_phone(phone)
     except Exception as e:
         logger.error(f"Failed to create initial lead: {e}")
         return None
 
 
-def update_lead_with_passport_data(
+async def update_lead_with_passport_data(
     deal_id: int, contact_id: int, passport_data: PassportData, config_data: Dict[str, Any]
 ) -> bool:
     contact_data = ContactData(
@@ -651,19 +965,19 @@ def update_lead_with_passport_data(
         gender=passport_data.gender,
     )
     try:
-        amo_service = create_amocrm_service(config_data)
-        return amo_service.update_lead_with_passport_data(deal_id, contact_id, contact_data)
+        amo_service = get_amocrm_service(config_data)
+        return await amo_service.update_lead_with_passport_data(deal_id, contact_id, contact_data)
     except Exception as e:
         logger.error(f"Failed to update lead with passport data: {e}")
         return False
 
 
-def update_lead_with_full_data(
+async def update_lead_with_full_data(
     deal_id: int, deal_data: DealData, config_data: Dict[str, Any]
 ) -> bool:
     try:
-        amo_service = create_amocrm_service(config_data)
-        return amo_service.update_contact_with_full_data(deal_id, deal_data)
+        amo_service = get_amocrm_service(config_data)
+        return await amo_service.update_contact_with_full_data(deal_id, deal_data)
     except Exception as e:
         logger.error(f"Failed to update lead with full data: {e}")
         return False
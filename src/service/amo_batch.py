@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# AmoCRM accepts up to 250 entities per request but recommends at most 50
+AMO_BATCH_LIMIT = 50
+
+
+def is_validation_rejection(error: Exception) -> bool:
+    """A 4xx answer other than 429: AmoCRM refused the body and applied nothing"""
+    status_code = getattr(error, "status_code", None)
+    return status_code is not None and 400 <= status_code < 500 and status_code != 429
+
+
+@dataclass
+class PendingBatch:
+    entity_type: str
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def has_entity(self, entity_id: Any) -> bool:
+        return entity_id is not None and any(item.get("id") == entity_id for item in self.items)
+
+
+class AmoCRMBatcher:
+    """
+    Coalesce single-entity AmoCRM writes into bulk requests.
+
+    Items submitted for the same ``(method, endpoint)`` within ``window`` seconds
+    are sent as one array body. Each caller gets back the entity AmoCRM returned
+    for its own item: created entities are matched by ``request_id``, updated ones
+    by ``id``.
+    """
+
+    def __init__(
+        self,
+        request: Callable[..., Awaitable[Dict[str, Any]]],
+        window: float = 0.2,
+        max_batch: int = AMO_BATCH_LIMIT,
+    ):
+        self._request = request
+        self.window = window
+        self.max_batch = min(max_batch, AMO_BATCH_LIMIT)
+        self._pending: Dict[Tuple[str, str], PendingBatch] = {}
+        self._send_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(
+        self, method: str, endpoint: str, entity_type: str, item: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        key = (method, endpoint)
+        batch = self._pending.get(key)
+
+        # Two writes to the same entity must not share one array body
+        if batch is not None and batch.has_entity(item.get("id")):
+            self._flush(key)
+            batch = None
+
+        if batch is None:
+            batch = PendingBatch(entity_type=entity_type)
+            self._pending[key] = batch
+            loop = asyncio.get_running_loop()
+            batch.flush_handle = loop.call_later(self.window, self._flush, key)
+
+        future = asyncio.get_running_loop().create_future()
+        batch.items.append(dict(item))
+        batch.futures.append(future)
+
+        if len(batch.items) >= self.max_batch:
+            self._flush(key)
+
+        return await future
+
+    def _flush(self, key: Tuple[str, str]):
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+        task = asyncio.get_running_loop().create_task(self._send(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key: Tuple[str, str], batch: PendingBatch):
+        lock = self._send_locks.setdefault(key, asyncio.Lock())
+        # Batches for one endpoint go out in submission order
+        async with lock:
+            try:
+                results = await self._send_items(key, batch.entity_type, batch.items)
+            except Exception as e:
+                if len(batch.items) == 1 or not is_validation_rejection(e):
+                    # After a timeout or 5xx the bulk write may have been applied,
+                    # so resending the items could create duplicates
+                    self._resolve(batch.futures, error=e)
+                    return
+                # One invalid entity rejects the whole array, so retry one by one
+                logger.warning(
+                    f"Bulk {key[0]} {key[1]} of {len(batch.items)} items failed, "
+                    f"retrying individually: {e}"
+                )
+                await self._send_individually(key, batch)
+                return
+
+            for future, result in zip(batch.futures, results):
+                self._resolve([future], result=result)
+
+    async def _send_individually(self, key: Tuple[str, str], batch: PendingBatch):
+        for item, future in zip(batch.items, batch.futures):
+            try:
+                results = await self._send_items(key, batch.entity_type, [item])
+                self._resolve([future], result=results[0])
+            except Exception as e:
+                self._resolve([future], error=e)
+
+    async def _send_items(
+        self, key: Tuple[str, str], entity_type: str, items: List[Dict[str, Any]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        method, endpoint = key
+        body = []
+        for index, item in enumerate(items):
+            if "id" not in item:
+                item = {**item, "request_id": str(index)}
+            body.append(item)
+
+        data = await self._request(method, endpoint, json_data=body)
+        entities = (data or {}).get("_embedded", {}).get(entity_type, [])
+
+        by_request_id = {
+            str(entity["request_id"]): entity
+            for entity in entities
+            if entity.get("request_id") is not None
+        }
+        by_id = {entity.get("id"): entity for entity in entities}
+
+        results = []
+        for index, item in enumerate(body):
+            if "id" in item:
+                result = by_id.get(item["id"])
+            else:
+                result = by_request_id.get(str(index))
+            if result is None and index < len(entities):
+                result = entities[index]
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _resolve(
+        futures: List[asyncio.Future],
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[Exception] = None,
+    ):
+        for future in futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
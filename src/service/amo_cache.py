@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+CUSTOM_FIELD_ENTITIES = ("contacts", "leads")
+
+
+class CustomFieldSchemaCache:
+    """
+    Field name -> field ID maps for AmoCRM contacts and leads.
+
+    Maps live for ``ttl`` seconds and are mirrored to ``snapshot_path`` so a
+    freshly started worker can build payloads without downloading the schema.
+    """
+
+    def __init__(self, ttl: float, snapshot_path: Optional[str] = None):
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self._fields: Dict[str, Dict[str, int]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._locks = {entity: asyncio.Lock() for entity in CUSTOM_FIELD_ENTITIES}
+
+    def is_fresh(self, entity: str) -> bool:
+        loaded_at = self._loaded_at.get(entity)
+        return loaded_at is not None and time.time() - loaded_at < self.ttl
+
+    def invalidate(self, entity: str):
+        self._loaded_at.pop(entity, None)
+
+    async def get(
+        self, entity: str, fetch: Callable[[str], Awaitable[Dict[str, int]]]
+    ) -> Dict[str, int]:
+        if self.is_fresh(entity):
+            return self._fields[entity]
+
+        async with self._locks[entity]:
+            # Another coroutine may have refreshed the map while we waited
+            if self.is_fresh(entity):
+                return self._fields[entity]
+
+            try:
+                self._fields[entity] = await fetch(entity)
+                self._loaded_at[entity] = time.time()
+                self.save_snapshot()
+            except Exception as e:
+                logger.error(f"Failed to refresh {entity} custom fields: {e}")
+
+        # A stale map is still better than dropping every custom field
+        return self._fields.get(entity, {})
+
+    def load_snapshot(self) -> bool:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as snapshot:
+                data = json.load(snapshot)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable AmoCRM field snapshot: {e}")
+            return False
+
+        for entity in CUSTOM_FIELD_ENTITIES:
+            entry = data.get(entity) or {}
+            if entry.get("fields"):
+                self._fields[entity] = {
+                    name: int(field_id) for name, field_id in entry["fields"].items()
+                }
+                self._loaded_at[entity] = entry.get("loaded_at", 0)
+
+        return all(entity in self._fields for entity in CUSTOM_FIELD_ENTITIES)
+
+    def save_snapshot(self):
+        if not self.snapshot_path:
+            return
+
+        data = {
+            entity: {"loaded_at": self._loaded_at.get(entity, 0), "fields": fields}
+            for entity, fields in self._fields.items()
+        }
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as snapshot:
+                json.dump(data, snapshot, ensure_ascii=False)
+            # Several uvicorn workers share the file, so replace it atomically
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to write AmoCRM field snapshot: {e}")
+
+
+class PipelineCache:
+    """In-memory index of AmoCRM pipelines and their statuses by ``(pipeline_id, status_id)``"""
+
+    def __init__(self):
+        self._pipelines: Dict[int, Dict[str, Any]] = {}
+        self._statuses: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, pipelines: List[Dict[str, Any]]):
+        statuses = {}
+        for pipeline in pipelines:
+            for status in pipeline.get("_embedded", {}).get("statuses", []):
+                statuses[(pipeline["id"], status["id"])] = status
+
+        # Swap whole indexes so readers never see a half-built one
+        self._pipelines = {pipeline["id"]: pipeline for pipeline in pipelines}
+        self._statuses = statuses
+        self.loaded_at = time.time()
+
+    def get_pipeline(self, pipeline_id: int) -> Optional[Dict[str, Any]]:
+        return self._pipelines.get(pipeline_id)
+
+    def get_status(self, pipeline_id: int, status_id: int) -> Optional[Dict[str, Any]]:
+        return self._statuses.get((pipeline_id, status_id))
+
+    def missing(self, pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        return [pair for pair in pairs if pair not in self._statuses]
+
+    def start_refresh(
+        self,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        interval: float,
+    ):
+        async def refresh_forever():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    self.load(await fetch())
+                except Exception as e:
+                    logger.error(f"Failed to refresh AmoCRM pipelines: {e}")
+
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(refresh_forever())
+
+    async def stop_refresh(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+class ContactIndex:
+    """
+    Resolve phone numbers to AmoCRM contact IDs without a CRM search.
+
+    Recent results are kept in a bounded LRU; misses are looked up through
+    ``lookup`` (our own ``AMOCrmLead`` rows) before the caller falls back to
+    searching AmoCRM.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], Awaitable[Optional[int]]],
+        max_size: int = 10000,
+    ):
+        self._lookup = lookup
+        self.max_size = max_size
+        self._contacts: "OrderedDict[str, int]" = OrderedDict()
+
+    async def resolve(self, phone: str) -> Optional[int]:
+        contact_id = self._contacts.get(phone)
+        if contact_id is not None:
+            self._contacts.move_to_end(phone)
+            return contact_id
+
+        try:
+            contact_id = await self._lookup(phone)
+        except Exception as e:
+            logger.warning(f"Local contact lookup failed for {phone}: {e}")
+            return None
+
+        if contact_id is not None:
+            self.remember(phone, contact_id)
+        return contact_id
+
+    def remember(self, phone: str, contact_id: int):
+        self._contacts[phone] = contact_id
+        self._contacts.move_to_end(phone)
+        while len(self._contacts) > self.max_size:
+            self._contacts.popitem(last=False)
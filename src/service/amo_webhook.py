@@ -0,0 +1,166 @@
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import Integer, String, cast, column, func, literal_column, update, values
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.schemas.amo import LeadStatusEvent
+from src.utils.buffer import PeriodicFlushBuffer
+from sharq_models.models import AMOCrmLead  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+# Lead events AmoCRM sends that carry the current pipeline and status
+LEAD_STATUS_EVENTS = ("add", "update", "status")
+
+LEAD_STAGES = {
+    "FIRST_CREATE": "first_create",
+    "ACCEPTED": "lead_accepted",
+    "REJECTED": "lead_rejected",
+    "GET_CONTRACT": "get_contract",
+}
+
+_FORM_KEY = re.compile(r"^leads\[(\w+)\]\[(\d+)\]\[(\w+)\]$")
+
+
+def parse_lead_events(form: Iterable[Tuple[str, str]]) -> List[LeadStatusEvent]:
+    """
+    Read lead events from an AmoCRM webhook body.
+
+    AmoCRM posts form fields like ``leads[status][0][id]=123``; only events that
+    carry ``id``, ``status_id`` and ``pipeline_id`` are returned. Events without
+    a timestamp get the receive time, so they are not older than every stored status.
+    """
+    received_at = int(time.time())
+    raw: Dict[Tuple[str, str], Dict[str, str]] = {}
+    for key, value in form:
+        match = _FORM_KEY.match(key)
+        if match is None or match.group(1) not in LEAD_STATUS_EVENTS:
+            continue
+        event_type, index, field = match.groups()
+        raw.setdefault((event_type, index), {})[field] = value
+
+    events = []
+    for fields in raw.values():
+        try:
+            events.append(
+                LeadStatusEvent(
+                    lead_id=int(fields["id"]),
+                    status_id=int(fields["status_id"]),
+                    pipeline_id=int(fields["pipeline_id"]),
+                    updated_at=int(
+                        fields.get("updated_at") or fields.get("last_modified") or received_at
+                    ),
+                )
+            )
+        except (KeyError, ValueError):
+            continue
+    return events
+
+
+def lead_data_json():
+    """``AMOCrmLead.lead_data`` as JSONB, ``{}`` when it is NULL"""
+    return func.coalesce(cast(AMOCrmLead.lead_data, JSONB), cast(literal_column("'{}'"), JSONB))
+
+
+def lead_data_with(key: str, value):
+    """
+    ``lead_data`` with only ``key`` replaced by the SQL expression ``value``.
+
+    Assigned in an UPDATE, this leaves keys written concurrently by other
+    writers alone, unlike saving back a dict read earlier.
+    """
+    return cast(
+        func.jsonb_set(lead_data_json(), literal_column(f"'{{{key}}}'"), value),
+        AMOCrmLead.lead_data.type,
+    )
+
+
+class LeadStatusBuffer(PeriodicFlushBuffer):
+    """
+    Collect lead status events and write them to ``AMOCrmLead.lead_data`` in batches.
+
+    Events for the same lead are collapsed to the newest one, so a burst of
+    stage changes costs a single update per flush.
+    """
+
+    def __init__(self, window: float = 1.0, max_size: int = 200):
+        super().__init__(window=window, max_size=max_size)
+        self._pending: Dict[int, LeadStatusEvent] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, events: List[LeadStatusEvent]):
+        for event in events:
+            current = self._pending.get(event.lead_id)
+            if current is None or event.updated_at >= current.updated_at:
+                self._pending[event.lead_id] = event
+        self._notify_if_full()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            events, self._pending = self._pending, {}
+
+            received_at = datetime.now().isoformat()
+            incoming = values(
+                column("lead_id", Integer),
+                column("pipeline_id", Integer),
+                column("status_id", Integer),
+                column("updated_at", Integer),
+                column("received_at", String),
+                name="incoming",
+            ).data([
+                (event.lead_id, event.pipeline_id, event.status_id, event.updated_at, received_at)
+                for event in events.values()
+            ])
+            stored_at = func.coalesce(
+                lead_data_json()["status"]["updated_at"].as_integer(), 0
+            )
+
+            try:
+                async with AsyncSessionLocal() as session:
+                    # One statement that only touches the "status" key, so the outbox
+                    # worker's "synced_at" writes in between are never overwritten
+                    result = await session.execute(
+                        update(AMOCrmLead)
+                        .where(
+                            AMOCrmLead.lead_id == incoming.c.lead_id,
+                            stored_at <= incoming.c.updated_at,
+                        )
+                        .values(
+                            lead_data=lead_data_with(
+                                "status",
+                                func.jsonb_build_object(
+                                    "pipeline_id", incoming.c.pipeline_id,
+                                    "status_id", incoming.c.status_id,
+                                    "updated_at", incoming.c.updated_at,
+                                    "received_at", incoming.c.received_at,
+                                ),
+                            )
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Failed to store {len(events)} AmoCRM lead statuses: {e}")
+                # Keep the events unless newer ones arrived meanwhile
+                for lead_id, event in events.items():
+                    self._pending.setdefault(lead_id, event)
+                return 0
+
+            return result.rowcount
+
+
+lead_status_buffer = LeadStatusBuffer(
+    window=settings.amo_crm_webhook_flush_interval,
+    max_size=settings.amo_crm_webhook_batch_size,
+)
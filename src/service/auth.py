@@ -6,18 +6,18 @@ from fastapi.security import (
     OAuth2PasswordRequestForm,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
 
 
-from src.service.amo import create_initial_lead
+from src.service.outbox import CRMOutbox, OUTBOX_EVENT_TYPES
 from src.schemas.sms import RegisterWithVerificationRequest
 from src.service.sms import SMSVerificationService
 from src.service import BasicCrud
-from src.utils import hash_password, authenticate_user, create_access_token
+from src.utils import hash_password_async, authenticate_user, create_access_token
 from src.schemas.user import Token, RegisterData
-from sharq_models.models import User, AMOCrmLead # type: ignore
-from src.schemas.amo import AMOCrmLead as AMOCrmLeadSchema
+from sharq_models.models import User # type: ignore
 from src.service.role import RoleService
-from src.core.config import settings
+from src.utils.phone_index import phone_exists, phone_index
 
 
 class UserAuthService(BasicCrud[User, RegisterData]):
@@ -32,29 +32,23 @@ class UserAuthService(BasicCrud[User, RegisterData]):
             user_data.phone_number, user_data.verification_code
         )
 
-        if await self.get_by_field(
-            model=User, field_name="phone_number", field_value=user_data.phone_number
-        ):
+        if await phone_exists(self.db, user_data.phone_number):
             raise HTTPException(status_code=400, detail="Foydalanuvchi allaqachon mavjud")
 
-        role_service = RoleService(self.db)
-        if user_data.role_id:
-            await role_service.get_role_by_id(user_data.role_id)
-        else:
-            default_role = await role_service.get_default_role()
-            user_data.role_id = default_role.id
+        # Public sign-up always gets the applicant role; staff roles are granted elsewhere
+        default_role = await RoleService(self.db).get_default_role()
 
         user_info = RegisterData(
             phone_number=user_data.phone_number,
-            password=hash_password(user_data.password),
-            role_id=user_data.role_id,
+            password=await hash_password_async(user_data.password),
+            role_id=default_role.id,
         )
-        result = await super().create(model=User, obj_items=user_info)
+        result = await self.create_with_initial_lead(user_info)
+        phone_index.add(result.phone_number)
 
         access_token = create_access_token(
             data={"sub": result.phone_number, "role_id": result.role_id},
         )
-        await self.handle_initial_lead(result.id, user_data.phone_number)
 
         return dict(
             message="Foydalanuvchi muvaffaqiyatli ro'yxatdan o'tdi",
@@ -66,24 +60,24 @@ class UserAuthService(BasicCrud[User, RegisterData]):
             access_token=access_token,
         )
 
-    async def handle_initial_lead(self, user_id: int, phone_number: str):
-        lead = await self.get_by_field(
-            model=AMOCrmLead, field_name="user_id", field_value=user_id
-        )
-        if not lead:
-            initial_lead = create_initial_lead(phone_number, settings.amo_crm_config)
-            if initial_lead:
-                await self.create(
-                    model=AMOCrmLead,
-                    obj_items=AMOCrmLeadSchema(
-                        user_id=user_id,
-                        contact_id=initial_lead.get("contact_id"),
-                        lead_id=initial_lead.get("deal_id"),
-                        phone_number=phone_number,
-                        contact_data={},
-                        lead_data={},
-                    ),
-                )
+    async def create_with_initial_lead(self, user_info: RegisterData) -> User:
+        """Insert the user and its AmoCRM initial-lead outbox event in one transaction"""
+        try:
+            user = User(**user_info.model_dump())
+            self.db.add(user)
+            await self.db.flush()
+
+            CRMOutbox(self.db).enqueue(
+                user_id=user.id,
+                event_type=OUTBOX_EVENT_TYPES["INITIAL_LEAD"],
+                payload={"phone_number": user.phone_number},
+            )
+            await self.db.commit()
+            await self.db.refresh(user)
+            return user
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise e
 
     async def login(
         self, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
@@ -3,9 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sharq_models.models import Contract  # type: ignore
 from src.service import BasicCrud
 from urllib.parse import urljoin
-from sqlalchemy import select
+from sqlalchemy import select, exists
 import os
 import httpx
+from src.utils.circuit_breaker import (
+    UPSTREAMS,
+    CircuitOpenError,
+    circuit_open_exception,
+    get_circuit_breaker,
+)
 
 
 class ReportService(BasicCrud):
@@ -22,8 +28,23 @@ class ReportService(BasicCrud):
         file_url = urljoin(self.BASE_FILE_SERVER_URL + "/", file_path.lstrip("/"))
         filename = os.path.basename(file_path)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(file_url)
+        circuit = get_circuit_breaker(UPSTREAMS["FILE_SERVER"])
+        try:
+            circuit.before_call()
+        except CircuitOpenError as e:
+            raise circuit_open_exception(e, "Fayl serveri vaqtincha ishlamayapti, keyinroq qayta urinib ko'ring")
+
+        try:
+            async with httpx.AsyncClient(timeout=15.0) as client:
+                response = await client.get(file_url)
+        except httpx.TransportError:
+            circuit.record_failure()
+            raise HTTPException(status_code=503, detail="Fayl serveriga ulanib bo'lmadi")
+
+        if response.status_code >= 500:
+            circuit.record_failure()
+        else:
+            circuit.record_success()
 
         if response.status_code != 200:
             raise HTTPException(status_code=404, detail="File not found on remote server")
@@ -45,10 +66,8 @@ class ReportService(BasicCrud):
         return None
     
     async def check_by_status(self , user_id: int):
-        contract_status = await super().get_by_field(model=Contract , field_name="user_id" , field_value=user_id)
-        if not contract_status:
-            return False
-        if contract_status:
-            return True
+        # Only the local row counts: the AmoCRM stage can run ahead of it, and the
+        # download endpoints need the row
+        return bool(await self.db.scalar(select(exists().where(Contract.user_id == user_id))))
             
 
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.models import CRMOutboxEvent
+from src.service import BasicCrud
+from src.service.amo import AmoCRMService
+from src.service.crm_sync import CRMSyncService, build_contact_data
+from src.service.outbox import OUTBOX_EVENT_TYPES, OUTBOX_STATUSES
+from src.service.study_info import build_lead_data
+from sharq_models.models import User, AMOCrmLead, PassportData, StudyInfo  # type: ignore
+from sharq_models.models.user import Role  # type: ignore
+
+
+@dataclass
+class ReconcileItem:
+    """What one applicant is missing in AmoCRM"""
+
+    user_id: int
+    phone_number: str
+    create_lead: bool
+    contact_data: Optional[Dict[str, Any]] = None
+    lead_data: Optional[Dict[str, Any]] = None
+
+    @property
+    def actions(self) -> List[str]:
+        actions = []
+        if self.create_lead:
+            actions.append(OUTBOX_EVENT_TYPES["INITIAL_LEAD"])
+        if self.contact_data is not None:
+            actions.append(OUTBOX_EVENT_TYPES["PASSPORT_DATA"])
+        if self.lead_data is not None:
+            actions.append(OUTBOX_EVENT_TYPES["FULL_DATA"])
+        return actions
+
+
+class CRMReconcileService(BasicCrud[AMOCrmLead, Any]):
+    """Find applicants whose AmoCRM lead is missing or behind the local data"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+
+    async def fetch_chunk(
+        self, after_user_id: int, limit: int, include_stale: bool = False
+    ) -> tuple[List[ReconcileItem], Optional[int]]:
+        """
+        Return the repairs needed for the next ``limit`` applicants after
+        ``after_user_id`` and the last user ID scanned (``None`` when done).
+        """
+        stmt = (
+            select(User.id, User.phone_number, AMOCrmLead, PassportData, StudyInfo)
+            .join(Role, Role.id == User.role_id)
+            .outerjoin(AMOCrmLead, AMOCrmLead.user_id == User.id)
+            .outerjoin(PassportData, PassportData.user_id == User.id)
+            .outerjoin(StudyInfo, StudyInfo.user_id == User.id)
+            .options(
+                selectinload(StudyInfo.study_language),
+                selectinload(StudyInfo.study_form),
+                selectinload(StudyInfo.study_direction),
+                selectinload(StudyInfo.study_type),
+            )
+            .where(User.id > after_user_id, Role.name == "user")
+            .order_by(User.id)
+            .limit(limit)
+        )
+        rows = (await self.db.execute(stmt)).all()
+        if not rows:
+            return [], None
+
+        # Users with queued outbox events are already on their way to AmoCRM
+        pending_stmt = (
+            select(CRMOutboxEvent.user_id)
+            .where(
+                CRMOutboxEvent.user_id.in_([row[0] for row in rows]),
+                CRMOutboxEvent.status.in_(
+                    [OUTBOX_STATUSES["PENDING"], OUTBOX_STATUSES["PROCESSING"]]
+                ),
+            )
+        )
+        pending_users = set((await self.db.execute(pending_stmt)).scalars().all())
+
+        items = []
+        for user_id, phone_number, lead, passport_data, study_info in rows:
+            if user_id in pending_users:
+                continue
+            item = self._plan(user_id, phone_number, lead, passport_data, study_info, include_stale)
+            if item is not None:
+                items.append(item)
+
+        return items, rows[-1][0]
+
+    def _plan(
+        self,
+        user_id: int,
+        phone_number: str,
+        lead: Optional[AMOCrmLead],
+        passport_data: Optional[PassportData],
+        study_info: Optional[StudyInfo],
+        include_stale: bool,
+    ) -> Optional[ReconcileItem]:
+        if lead is None:
+            synced = {}
+        elif include_stale:
+            synced = (lead.lead_data or {}).get("synced_at", {})
+        else:
+            return None
+
+        item = ReconcileItem(
+            user_id=user_id,
+            phone_number=phone_number,
+            create_lead=lead is None,
+        )
+        if passport_data is not None and OUTBOX_EVENT_TYPES["PASSPORT_DATA"] not in synced:
+            item.contact_data = build_contact_data(passport_data)
+        if study_info is not None and OUTBOX_EVENT_TYPES["FULL_DATA"] not in synced:
+            item.lead_data = build_lead_data(study_info)
+
+        return item if item.actions else None
+
+    async def repair(self, item: ReconcileItem, amo_service: AmoCRMService):
+        """Push one applicant in the same order the outbox would have"""
+        sync_service = CRMSyncService(self.db, amo_service)
+
+        if item.create_lead:
+            await sync_service.sync_initial_lead(
+                item.user_id, {"phone_number": item.phone_number}
+            )
+        if item.contact_data is not None:
+            await sync_service.sync_passport_data(
+                item.user_id, {"contact_data": item.contact_data}
+            )
+        if item.lead_data is not None:
+            await sync_service.sync_full_data(item.user_id, {"lead_data": item.lead_data})
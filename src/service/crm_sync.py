@@ -0,0 +1,159 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import cast, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import CRMOutboxEvent
+from src.schemas.amo import AMOCrmLead as AMOCrmLeadSchema
+from src.service import BasicCrud
+from src.service.amo import AmoCRMException, AmoCRMService, ContactData, DealData
+from src.service.amo_webhook import lead_data_json, lead_data_with
+from src.service.outbox import OUTBOX_EVENT_TYPES
+from sharq_models.models import AMOCrmLead  # type: ignore
+
+
+class CRMSyncError(Exception):
+    """Raised when an outbox event could not be delivered and should be retried"""
+
+
+def build_contact_data(passport_data) -> Dict[str, Any]:
+    """Contact snapshot kept in ``AMOCrmLead.contact_data`` for a passport record"""
+    return {
+        "jshshir": passport_data.jshshir,
+        "first_name": passport_data.first_name,
+        "last_name": passport_data.last_name,
+        "middle_name": passport_data.third_name,
+        "date_of_birth": str(passport_data.date_of_birth),
+        "gender": passport_data.gender,
+        "nationality": passport_data.nationality,
+        "passport_series_number": passport_data.passport_series_number
+    }
+
+
+class CRMSyncService(BasicCrud[AMOCrmLead, AMOCrmLeadSchema]):
+    """Apply outbox events to AmoCRM and mirror the result into ``AMOCrmLead``"""
+
+    def __init__(self, db: AsyncSession, amo_service: AmoCRMService):
+        super().__init__(db)
+        self.amo_service = amo_service
+        self.handlers = {
+            OUTBOX_EVENT_TYPES["INITIAL_LEAD"]: self.sync_initial_lead,
+            OUTBOX_EVENT_TYPES["PASSPORT_DATA"]: self.sync_passport_data,
+            OUTBOX_EVENT_TYPES["FULL_DATA"]: self.sync_full_data,
+        }
+
+    async def handle(self, event: CRMOutboxEvent):
+        handler = self.handlers.get(event.event_type)
+        if handler is None:
+            raise CRMSyncError(f"Unknown outbox event type: {event.event_type}")
+        await handler(event.user_id, event.payload or {})
+
+    async def _get_lead(self, user_id: int):
+        return await super().get_by_field(
+            model=AMOCrmLead, field_name="user_id", field_value=user_id
+        )
+
+    async def _require_lead(self, user_id: int):
+        lead = await self._get_lead(user_id)
+        if not lead:
+            raise CRMSyncError(f"AmoCRM lead for user {user_id} is not created yet")
+        return lead
+
+    async def sync_initial_lead(self, user_id: int, payload: Dict[str, Any]):
+        if await self._get_lead(user_id):
+            return
+
+        phone_number = payload["phone_number"]
+        # A previous attempt may have created the deal and died before saving it
+        initial_lead = await self._find_unclaimed_initial_lead(phone_number)
+        if initial_lead is None:
+            initial_lead = await self.amo_service.create_initial_contact_with_phone(phone_number)
+        if not initial_lead:
+            raise CRMSyncError(f"Failed to create initial lead for user {user_id}")
+
+        await self.create(
+            model=AMOCrmLead,
+            obj_items=AMOCrmLeadSchema(
+                user_id=user_id,
+                contact_id=initial_lead.get("contact_id"),
+                lead_id=initial_lead.get("deal_id"),
+                phone_number=phone_number,
+                contact_data={},
+                lead_data={},
+            ),
+        )
+
+    async def _find_unclaimed_initial_lead(self, phone_number: str) -> Optional[Dict[str, Any]]:
+        """An initial deal for the phone in AmoCRM that no ``AMOCrmLead`` row points to yet"""
+        try:
+            deals = await self.amo_service.find_initial_deals(phone_number)
+        except AmoCRMException as e:
+            # Creating blindly could duplicate the deal, so retry the event later
+            raise CRMSyncError(f"Failed to look up initial deals for {phone_number}: {e}")
+        if not deals:
+            return None
+
+        claimed = set(
+            (
+                await self.db.execute(
+                    select(AMOCrmLead.lead_id).where(
+                        AMOCrmLead.lead_id.in_([deal["deal_id"] for deal in deals])
+                    )
+                )
+            ).scalars().all()
+        )
+        return next((deal for deal in deals if deal["deal_id"] not in claimed), None)
+
+    async def sync_passport_data(self, user_id: int, payload: Dict[str, Any]):
+        lead = await self._require_lead(user_id)
+        contact_data = payload["contact_data"]
+        lead.contact_data = contact_data
+        await self.db.commit()
+
+        updated = await self.amo_service.update_lead_with_passport_data(
+            lead.lead_id,
+            lead.contact_id,
+            ContactData(
+                first_name=contact_data.get("first_name"),
+                last_name=contact_data.get("last_name"),
+                middle_name=contact_data.get("middle_name"),
+                gender=contact_data.get("gender"),
+            ),
+        )
+        if not updated:
+            raise CRMSyncError(f"Failed to update lead {lead.lead_id} with passport data")
+
+        await self._mark_synced(lead, OUTBOX_EVENT_TYPES["PASSPORT_DATA"])
+
+    async def sync_full_data(self, user_id: int, payload: Dict[str, Any]):
+        lead = await self._require_lead(user_id)
+        contact_data = lead.contact_data or {}
+
+        updated = await self.amo_service.update_contact_with_full_data(
+            lead.lead_id,
+            DealData(**{
+                "name": f"{contact_data.get('first_name', '')} {contact_data.get('last_name', '')}",
+                "contact_id": lead.contact_id,
+                **payload["lead_data"],
+            }),
+        )
+        if not updated:
+            raise CRMSyncError(f"Failed to update lead {lead.lead_id} with full data")
+
+        await self._mark_synced(lead, OUTBOX_EVENT_TYPES["FULL_DATA"])
+
+    async def _mark_synced(self, lead: AMOCrmLead, event_type: str):
+        """Record in ``lead_data`` which parts of the applicant reached AmoCRM"""
+        # Only "synced_at" is touched; the webhook may store a status at any moment
+        synced_at = func.coalesce(
+            lead_data_json()["synced_at"], cast(literal_column("'{}'"), JSONB)
+        ).op("||")(func.jsonb_build_object(event_type, datetime.now().isoformat()))
+        await self.db.execute(
+            update(AMOCrmLead)
+            .where(AMOCrmLead.id == lead.id)
+            .values(lead_data=lead_data_with("synced_at", synced_at))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
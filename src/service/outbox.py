@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import select, update, and_, or_, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.models import CRMOutboxEvent
+
+
+OUTBOX_EVENT_TYPES = {
+    "INITIAL_LEAD": "initial_lead",
+    "PASSPORT_DATA": "passport_data",
+    "FULL_DATA": "full_data",
+}
+
+OUTBOX_STATUSES = {
+    "PENDING": "pending",
+    "PROCESSING": "processing",
+    "DONE": "done",
+    "DEAD": "dead",
+}
+
+
+class CRMOutbox:
+    """Write and claim AmoCRM sync events stored in ``crm_outbox_events``"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def enqueue(self, user_id: int, event_type: str, payload: Dict[str, Any]) -> CRMOutboxEvent:
+        """Add an event to the current transaction; the caller commits it with its own rows"""
+        now = datetime.now()
+        event = CRMOutboxEvent(
+            user_id=user_id,
+            event_type=event_type,
+            payload=payload,
+            status=OUTBOX_STATUSES["PENDING"],
+            attempts=0,
+            available_at=now,
+            created_at=now,
+        )
+        self.db.add(event)
+        return event
+
+    async def claim_batch(self, limit: int, lease_seconds: int) -> List[CRMOutboxEvent]:
+        """
+        Lock the oldest runnable event of each user and lease it to this worker.
+
+        An event is runnable only when no earlier event of the same user is still
+        pending or processing, which keeps the per-user order of CRM writes.
+        """
+        now = datetime.now()
+        earlier = aliased(CRMOutboxEvent)
+        runnable = or_(
+            CRMOutboxEvent.status == OUTBOX_STATUSES["PENDING"],
+            CRMOutboxEvent.status == OUTBOX_STATUSES["PROCESSING"],
+        )
+        blocked_by_earlier = exists().where(
+            and_(
+                earlier.user_id == CRMOutboxEvent.user_id,
+                earlier.id < CRMOutboxEvent.id,
+                earlier.status.in_(
+                    [OUTBOX_STATUSES["PENDING"], OUTBOX_STATUSES["PROCESSING"]]
+                ),
+            )
+        )
+        stmt = (
+            select(CRMOutboxEvent)
+            .where(
+                runnable,
+                CRMOutboxEvent.available_at <= now,
+                ~blocked_by_earlier,
+            )
+            .order_by(CRMOutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=CRMOutboxEvent)
+        )
+        result = await self.db.execute(stmt)
+        events = list(result.scalars().all())
+
+        lease_until = now + timedelta(seconds=lease_seconds)
+        for event in events:
+            event.status = OUTBOX_STATUSES["PROCESSING"]
+            event.available_at = lease_until
+        await self.db.commit()
+
+        return events
+
+    async def mark_done(self, event_id: int):
+        await self.db.execute(
+            update(CRMOutboxEvent)
+            .where(CRMOutboxEvent.id == event_id)
+            .values(
+                status=OUTBOX_STATUSES["DONE"],
+                processed_at=datetime.now(),
+                last_error=None,
+            )
+        )
+        await self.db.commit()
+
+    async def mark_failed(
+        self,
+        event_id: int,
+        attempts: int,
+        error: str,
+        max_attempts: int,
+        backoff_seconds: float,
+    ):
+        """Reschedule with exponential backoff, or dead-letter after ``max_attempts``"""
+        now = datetime.now()
+        if attempts >= max_attempts:
+            values = dict(
+                status=OUTBOX_STATUSES["DEAD"],
+                processed_at=now,
+            )
+        else:
+            delay = min(backoff_seconds * (2 ** (attempts - 1)), 3600)
+            values = dict(
+                status=OUTBOX_STATUSES["PENDING"],
+                available_at=now + timedelta(seconds=delay),
+            )
+
+        await self.db.execute(
+            update(CRMOutboxEvent)
+            .where(CRMOutboxEvent.id == event_id)
+            .values(attempts=attempts, last_error=error[:2000], **values)
+        )
+        await self.db.commit()
+
+    async def defer(self, event_id: int, delay: float):
+        """Put a leased event back without spending an attempt, e.g. while AmoCRM is down"""
+        await self.db.execute(
+            update(CRMOutboxEvent)
+            .where(CRMOutboxEvent.id == event_id)
+            .values(
+                status=OUTBOX_STATUSES["PENDING"],
+                available_at=datetime.now() + timedelta(seconds=delay),
+            )
+        )
+        await self.db.commit()
@@ -1,5 +1,8 @@
+import logging
+
 from fastapi import HTTPException, status
-from src.service.amo import update_lead_with_passport_data
+from src.service.outbox import CRMOutbox, OUTBOX_EVENT_TYPES
+from src.service.crm_sync import build_contact_data
 from src.service import BasicCrud
 from sharq_models.models import PassportData, AMOCrmLead #type: ignore
 from src.schemas.passport_data import (
@@ -8,9 +11,12 @@ from src.schemas.passport_data import (
     PersonalInfo,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.core.config import settings
 from src.clients.passport_data import PassportDataClient
 from src.utils.work_with_file import save_base64_image
+from src.utils.circuit_breaker import CircuitOpenError, circuit_open_exception
+
+
+logger = logging.getLogger(__name__)
 
 
 class PassportDataCrud(BasicCrud[PassportData, PassportDataBase]):
@@ -32,10 +38,15 @@ class PassportDataCrud(BasicCrud[PassportData, PassportDataBase]):
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Passport ma'lumotlari allaqachon mavjud"
             )
 
-        passport_data_response = await passport_data_client.get_passport_data(
-            passport_series_number=passport_data_item.passport_series_number,
-            jshshir=passport_data_item.jshshir,
-        )
+        try:
+            passport_data_response = await passport_data_client.get_passport_data(
+                passport_series_number=passport_data_item.passport_series_number,
+                jshshir=passport_data_item.jshshir,
+            )
+        except CircuitOpenError as e:
+            raise circuit_open_exception(
+                e, "Passport ma'lumotlari xizmati vaqtincha ishlamayapti, keyinroq qayta urinib ko'ring"
+            )
 
         data = passport_data_response.json().get("data")
         if not data:
@@ -54,28 +65,12 @@ class PassportDataCrud(BasicCrud[PassportData, PassportDataBase]):
             user_id=user_id, **PersonalInfo(**data).model_dump(by_alias=True)
         )
 
-        lead: AMOCrmLead = await self._get_lead(user_id)
-        if not lead:
-            print("Lead not found")
-            pass
-        else:
-            update_lead_with_passport_data(
-                deal_id=lead.lead_id,
-                contact_id=lead.contact_id,
-                passport_data=passport_data_with_user,
-                config_data=settings.amo_crm_config,
-            )
-            lead.contact_data = {
-                "jshshir": passport_data_with_user.jshshir,
-                "first_name": passport_data_with_user.first_name,
-                "last_name": passport_data_with_user.last_name,
-                "middle_name": passport_data_with_user.third_name,
-                "date_of_birth": str(passport_data_with_user.date_of_birth),
-                "gender": passport_data_with_user.gender,
-                "nationality": passport_data_with_user.nationality,
-                "passport_series_number": passport_data_with_user.passport_series_number
-            }
-            await self.db.commit()
+        # Committed together with the PassportData row by ``create`` below
+        CRMOutbox(self.db).enqueue(
+            user_id=user_id,
+            event_type=OUTBOX_EVENT_TYPES["PASSPORT_DATA"],
+            payload={"contact_data": build_contact_data(passport_data_with_user)},
+        )
 
         return await super().create(
             model=PassportData, obj_items=passport_data_with_user
@@ -85,7 +80,7 @@ class PassportDataCrud(BasicCrud[PassportData, PassportDataBase]):
         try:
             return await save_base64_image(base_64_image)
         except Exception as e:
-            print(f"Error saving image in background: {e}")
+            logger.exception(f"Error saving image in background: {e}")
 
     async def _get_lead(self, user_id: int):
         lead = await super().get_by_field(
@@ -1,15 +1,57 @@
+from typing import Dict, Optional
+
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sharq_models.models.user import Role #type: ignore
 from src.schemas.role import RoleBase, RoleCreate, RoleResponse
 from src.service import BasicCrud
 
 
+DEFAULT_ROLE = "user"
+
+# Serializes creating the default role across workers starting at once
+DEFAULT_ROLE_LOCK_ID = 724601
+
+
+class RoleRegistry:
+    """In-memory copy of ``Role``, loaded at startup; roles almost never change"""
+
+    def __init__(self):
+        self._by_id: Dict[int, RoleResponse] = {}
+        self._by_name: Dict[str, RoleResponse] = {}
+
+    def add(self, role: Role) -> RoleResponse:
+        cached = RoleResponse.model_validate(role)
+        self._by_id[cached.id] = cached
+        self._by_name[cached.name] = cached
+        return cached
+
+    def get_by_id(self, role_id: int) -> Optional[RoleResponse]:
+        return self._by_id.get(role_id)
+
+    def get_by_name(self, name: str) -> Optional[RoleResponse]:
+        return self._by_name.get(name)
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+role_registry = RoleRegistry()
+
+
 class RoleService(BasicCrud[Role, RoleBase]):
     def __init__(self, db: AsyncSession):
         super().__init__(db)
 
+    async def load_registry(self):
+        """Fill ``role_registry`` and make sure the default role exists; run once at startup"""
+        result = await self.db.execute(select(Role))
+        for role in result.scalars().all():
+            role_registry.add(role)
+        await self.get_default_role()
+
     async def create_role(self, role_data: RoleCreate) -> RoleResponse:
         existing_role = await self.get_by_field(
             model=Role, field_name="name", field_value=role_data.name
@@ -20,25 +62,40 @@ class RoleService(BasicCrud[Role, RoleBase]):
                 detail="Ushbu nom bilan rol allaqachon mavjud",
             )
 
-        return await super().create(model=Role, obj_items=role_data)
+        role = await super().create(model=Role, obj_items=role_data)
+        return role_registry.add(role)
 
     async def get_role_by_id(self, role_id: int) -> RoleResponse:
+        cached = role_registry.get_by_id(role_id)
+        if cached:
+            return cached
+
+        # Only roles added after startup get here
         role = await super().get_by_id(model=Role, item_id=role_id)
         if not role:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Rol topilmadi"
             )
-        return role
+        return role_registry.add(role)
 
-    async def get_default_role(self) -> Role:
-        stmt = select(Role).where(Role.name == "user")
-        result = await self.db.execute(stmt)
-        role = result.scalars().first()
+    async def get_default_role(self) -> RoleResponse:
+        cached = role_registry.get_by_name(DEFAULT_ROLE)
+        if cached:
+            return cached
+
+        stmt = select(Role).where(Role.name == DEFAULT_ROLE)
+        role = (await self.db.execute(stmt)).scalars().first()
 
         if not role:
-            default_role_data = RoleCreate(
-                name="user", description="Default user role", permissions='["read:own"]'
-            )
-            role = await self.create_role(default_role_data)
+            # Every worker may get here at startup; the lock makes them take turns
+            # and the insert is a no-op for all but the first
+            await self.db.execute(select(func.pg_advisory_xact_lock(DEFAULT_ROLE_LOCK_ID)))
+            role = (await self.db.execute(stmt)).scalars().first()
+            if not role:
+                await self.db.execute(
+                    insert(Role).values(name=DEFAULT_ROLE).on_conflict_do_nothing()
+                )
+                role = (await self.db.execute(stmt)).scalars().one()
+            await self.db.commit()
 
-        return role
+        return role_registry.add(role)
@@ -1,18 +1,57 @@
 import httpx
+import logging
+from urllib.parse import quote
 import random
 import string
-from typing import Optional
+from typing import List, Optional
 from fastapi import HTTPException , status
-import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_ 
+from sqlalchemy import select, update
 
-from src.utils.auth import hash_password
+from src.utils.auth import hash_password_async
+from src.utils.principal import invalidate_principal, record_password_change
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from src.core.config import settings
-from sharq_models.models.user import SMSVerificationSession , User #type: ignore
+from src.clients.eskiz import EskizAuthError, eskiz_token_manager
+from src.service.sms_outbox import SMSOutbox, SMS_STATUSES
+from src.utils.circuit_breaker import (
+    UPSTREAMS,
+    CircuitOpenError,
+    circuit_open_exception,
+    get_circuit_breaker,
+)
+from src.service.sms_session_store import (
+    SESSION_LIFETIME,
+    VERIFY_RESULTS,
+    VerificationSession,
+    get_session_store,
+)
+from sharq_models.models.user import User #type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+
+def sms_callback_base_url() -> str:
+    if settings.sms_callback_url:
+        return settings.sms_callback_url
+    if settings.public_base_url:
+        return f"{settings.public_base_url.rstrip('/')}/api/sms/callback"
+    return ""
+
+
+def check_sms_callback_config():
+    """Warn at startup when Eskiz delivery reports cannot reach ``/api/sms/callback``"""
+    if not sms_callback_base_url():
+        logger.warning(
+            "Neither SMS_CALLBACK_URL nor PUBLIC_BASE_URL is set, SMS delivery reports are disabled"
+        )
+    elif not settings.sms_callback_secret:
+        logger.warning(
+            "SMS_CALLBACK_SECRET is empty, every SMS delivery report will be rejected with 403"
+        )
 
 
 class SMSService:
@@ -20,61 +59,151 @@ class SMSService:
         self.db = db
         self.base_url = settings.sms_base_url
         self.sender = settings.sms_sender
+        self.circuit = get_circuit_breaker(UPSTREAMS["SMS"])
+
+    @property
+    def callback_url(self) -> str:
+        url = sms_callback_base_url()
+        if not url or not settings.sms_callback_secret:
+            return url
+        separator = "&" if "?" in url else "?"
+        return f"{url}{separator}token={quote(settings.sms_callback_secret, safe='')}"
 
     def generate_verification_code(self, length: int = 4) -> str:
         return "".join(random.choices(string.digits, k=length))
 
-    async def get_bearer_token(self) -> str:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/auth/login",
-                headers={"Content-Type": "application/json"},
-                json={"email": settings.sms_sender, "password": settings.sms_api_key},
+    async def get_bearer_token(self, stale_token: Optional[str] = None) -> str:
+        return await eskiz_token_manager.get_token(stale_token=stale_token)
+
+    async def _post_sms(
+        self,
+        client: httpx.AsyncClient,
+        bearer_token: str,
+        phone_number: str,
+        message: str,
+        user_sms_id: Optional[str] = None,
+    ) -> httpx.Response:
+        payload = {
+            "mobile_phone": phone_number,
+            "message": message,
+            "from": self.sender,
+        }
+        if self.callback_url:
+            payload["callback_url"] = self.callback_url
+        if user_sms_id:
+            # Echoed back in the delivery report callback
+            payload["user_sms_id"] = user_sms_id
+        return await client.post(
+            f"{self.base_url}/message/sms/send",
+            headers={
+                "Authorization": f"Bearer {bearer_token}",
+                "Content-Type": "application/json",
+            },
+            json=payload,
+            timeout=30.0,
+        )
+
+    async def send_sms(
+        self, phone_number: str, message: str, user_sms_id: Optional[str] = None
+    ) -> bool:
+        try:
+            return await self.deliver(phone_number, message, user_sms_id)
+        except CircuitOpenError as e:
+            raise circuit_open_exception(
+                e, "SMS xizmati vaqtincha ishlamayapti, keyinroq qayta urinib ko'ring"
             )
-            print(settings.sms_sender, settings.sms_api_key)
-            print(response.json())
-            if response.status_code == 200:
-                return response.json().get("data").get("token")
-            else:
-                raise HTTPException(
-                    status_code=500, detail="Bearer tokenini olib bo'lmadi"
-                )
+        except EskizAuthError as e:
+            if e.unreachable:
+                raise HTTPException(status_code=503, detail="SMS xizmatiga ulanib bo'lmadi")
+            raise HTTPException(status_code=500, detail="Bearer tokenini olib bo'lmadi")
+
+    async def deliver(
+        self, phone_number: str, message: str, user_sms_id: Optional[str] = None
+    ) -> bool:
+        """Like ``send_sms`` but raises ``CircuitOpenError`` and ``EskizAuthError``, for workers"""
+        self.circuit.before_call()
 
-    async def send_sms(self, phone_number: str, message: str) -> bool:
         bearer_token = await self.get_bearer_token()
         try:
             async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/message/sms/send",
-                    headers={
-                        "Authorization": f"Bearer {bearer_token}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "mobile_phone": phone_number,
-                        "message": message,
-                        "from": self.sender,
-                        "callback_url": settings.sms_callback_url,
-                    },
-                    timeout=30.0,
+                response = await self._post_sms(
+                    client, bearer_token, phone_number, message, user_sms_id
                 )
+                if response.status_code == 401:
+                    # The cached token was revoked or expired early
+                    bearer_token = await self.get_bearer_token(stale_token=bearer_token)
+                    response = await self._post_sms(
+                        client, bearer_token, phone_number, message, user_sms_id
+                    )
+
+                if response.status_code >= 500:
+                    self.circuit.record_failure()
+                else:
+                    self.circuit.record_success()
 
                 if response.status_code == 200:
                     return True
                 else:
-                    print(
+                    logger.warning(
                         f"SMS service error: {response.status_code} - {response.text}"
                     )
                     return False
 
+        except EskizAuthError:
+            raise
         except Exception as e:
-            print(f"Error sending SMS: {e}")
+            if isinstance(e, httpx.TransportError):
+                self.circuit.record_failure()
+            logger.exception(f"Error sending SMS: {e}")
             return False
 
+    async def send_batch(self, messages: List[dict], dispatch_id: int) -> httpx.Response:
+        """
+        Send up to a few hundred ``{"user_sms_id", "to", "text"}`` messages in one
+        Eskiz request.
+
+        Raises ``CircuitOpenError`` or ``httpx.TransportError`` when Eskiz is
+        unreachable, so the caller can leave the messages queued.
+        """
+        self.circuit.before_call()
+
+        payload = {
+            "messages": messages,
+            "from": self.sender,
+            "dispatch_id": dispatch_id,
+        }
+        if self.callback_url:
+            payload["callback_url"] = self.callback_url
+        bearer_token = await self.get_bearer_token()
+        try:
+            async with httpx.AsyncClient() as client:
+                for _ in range(2):
+                    response = await client.post(
+                        f"{self.base_url}/message/sms/send-batch",
+                        headers={"Authorization": f"Bearer {bearer_token}"},
+                        json=payload,
+                        timeout=60.0,
+                    )
+                    if response.status_code != 401:
+                        break
+                    bearer_token = await self.get_bearer_token(stale_token=bearer_token)
+        except httpx.TransportError:
+            self.circuit.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            self.circuit.record_failure()
+        else:
+            self.circuit.record_success()
+        return response
+
+    def build_verification_message(self, code: str) -> str:
+        return f"Sharq Universiteti. Qabuldan o'tish uchun tasdiqlash kod: {code}"
+
     async def send_verification_code(self, phone_number: str) -> str:
         code = self.generate_verification_code()
 
-        message = f"Sharq Universiteti. Qabuldan o'tish uchun tasdiqlash kod: {code}"
+        message = self.build_verification_message(code)
         # message = "This is test from Eskiz"
 
         success = await self.send_sms(phone_number, message)
@@ -87,118 +216,104 @@ class SMSService:
 
 
 class SMSVerificationService:
+    """
+    OTP sessions in the configured ``sms_session_backend``; the SMS itself is
+    always queued in the Postgres ``sms_outbox``, whichever backend that is.
+    """
+
     def __init__(self, db: AsyncSession):
         self.db = db
         self.sms_service = SMSService(db)
+        self.session_store = get_session_store(db)
 
     async def create_verification_session(self, phone_number: str) -> dict:
+        outbox = SMSOutbox(self.db)
         existing_session = await self.get_active_session(phone_number)
         if existing_session:
+            latest = await outbox.get_latest(phone_number)
+            send_status = latest.status if latest else None
+            if send_status in (None, SMS_STATUSES["FAILED"]):
+                # The previous send gave up, queue the same code again
+                outbox.enqueue(
+                    phone_number=phone_number,
+                    message=self.sms_service.build_verification_message(existing_session.code),
+                    session_id=existing_session.id,
+                    expires_at=existing_session.expires_at,
+                )
+                await self.db.commit()
+                send_status = SMS_STATUSES["PENDING"]
             return {
                 "message": "Verification code resent",
                 "phone_number": phone_number,
                 "expires_at": existing_session.expires_at,
+                "send_status": send_status,
             }
 
-        code = await self.sms_service.send_verification_code(phone_number)
+        code = self.sms_service.generate_verification_code()
 
         session_data = {
             "phone_number": phone_number,
             "code": code,
             "created_at": datetime.now(),
-            "expires_at": datetime.now() + timedelta(minutes=10),
+            "expires_at": datetime.now() + SESSION_LIFETIME,
             "verified": False,
         }
 
-        await self.store_verification_session(session_data)
+        # The SMS worker sends the code, the request only stores it
+        await self.store_verification_session(
+            session_data, message=self.sms_service.build_verification_message(code)
+        )
 
         return {
             "message": "Tasdiqlash kodi yuborildi",
             "phone_number": phone_number,
             "expires_at": session_data["expires_at"],
+            "send_status": SMS_STATUSES["PENDING"],
         }
 
-    async def verify_code(self, phone_number: str, code: str) -> bool:
-        session = await self.get_active_session(phone_number)
+    async def verify_code(self, phone_number: str, code: str, defer_commit: bool = False) -> bool:
+        result = await self.session_store.verify(phone_number, code, defer_commit=defer_commit)
 
-        if not session:
+        if result == VERIFY_RESULTS["NO_SESSION"]:
             raise HTTPException(
                 status_code=400, detail="Faol tekshirish seansi topilmadi"
             )
 
-        if session.expires_at < datetime.now():
-            raise HTTPException(status_code=400, detail="Tasdiqlash kodi muddati tugadi")
-
-        if session.code != code:
-            await self.increment_attempts(phone_number)
+        if result == VERIFY_RESULTS["WRONG_CODE"]:
             raise HTTPException(status_code=400, detail="Tasdiqlash kodi noto'g'ri")
 
-        await self.mark_session_verified(phone_number)
-
         return True
 
     async def get_active_session(
         self, phone_number: str
-    ) -> Optional[SMSVerificationSession]:
-        stmt = (
-            select(SMSVerificationSession)
-            .where(
-                and_(
-                    SMSVerificationSession.phone_number == phone_number,
-                    SMSVerificationSession.verified == sqlalchemy.false(),
-                    SMSVerificationSession.expires_at > datetime.now(),
-                )
-            )
-            .order_by(SMSVerificationSession.created_at.desc())
-        )
-
-        result = await self.db.execute(stmt)
-        return result.scalars().first()
-
-    async def store_verification_session(self, session_data: dict):
-        await self.invalidate_existing_sessions(session_data["phone_number"])
+    ) -> Optional[VerificationSession]:
+        return await self.session_store.get_active(phone_number)
 
-        session = SMSVerificationSession(
+    async def store_verification_session(self, session_data: dict, message: Optional[str] = None):
+        session = await self.session_store.create(
             phone_number=session_data["phone_number"],
             code=session_data["code"],
             created_at=session_data["created_at"],
             expires_at=session_data["expires_at"],
-            verified=session_data["verified"],
         )
 
-        self.db.add(session)
+        if message:
+            SMSOutbox(self.db).enqueue(
+                phone_number=session.phone_number,
+                message=message,
+                session_id=session.id,
+                expires_at=session.expires_at,
+            )
+        # Also commits the Postgres session row, if that backend is in use
         await self.db.commit()
-        await self.db.refresh(session)
 
         return session
 
     async def mark_session_verified(self, phone_number: str):
-        session = await self.get_active_session(phone_number)
-        if session:
-            session.verified = True
-            await self.db.commit()
-
-    async def invalidate_existing_sessions(self, phone_number: str):
-        stmt = select(SMSVerificationSession).where(
-            and_(
-                SMSVerificationSession.phone_number == phone_number,
-                SMSVerificationSession.verified == sqlalchemy.false(),
-            )
-        )
-
-        result = await self.db.execute(stmt)
-        sessions = result.scalars().all()
-
-        for session in sessions:
-            session.verified = True
-
-        await self.db.commit()
+        await self.session_store.mark_verified(phone_number)
 
     async def increment_attempts(self, phone_number: str):
-        session = await self.get_active_session(phone_number)
-        if session:
-            session.attempts += 1
-            await self.db.commit()
+        await self.session_store.increment_attempts(phone_number)
 
 
 
@@ -207,35 +322,33 @@ class SMSResetPassword:
         self.db = db
         self.sms_service = SMSVerificationService(db)
         
-    async def reset_password(self, verification_code: str, new_password: str):
-        stmt = (
-        select(SMSVerificationSession)
-        .where(SMSVerificationSession.code == verification_code)
-            )
-        result = await self.db.execute(stmt)
-        sms_data = result.scalars().first()
-        
-        check_status = await self.sms_service.verify_code(code=verification_code, phone_number=sms_data.phone_number)
-        
-
-
-        if not sms_data or not check_status:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Noto'g'ri yoki muddati o'tgan tasdiqlash kodi"
-            )
-        user_stmt = select(User).where(User.phone_number == sms_data.phone_number)
-        user_result = await self.db.execute(user_stmt)
-        user = user_result.scalars().first()
-
-        if not user:
+    async def reset_password(self, phone_number: str, verification_code: str, new_password: str):
+        # Locked and checked first, so a missing user never burns the code
+        user_id = await self.db.scalar(
+            select(User.id).where(User.phone_number == phone_number).with_for_update()
+        )
+        if user_id is None:
+            await self.db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Foydalanuvchi topilmadi"
             )
-        user.password = hash_password(new_password)
-        
+
+        # Resolved through the (phone_number, created_at) active-session index; the
+        # consumed session commits together with the new password below
+        await self.sms_service.verify_code(
+            phone_number=phone_number, code=verification_code, defer_commit=True
+        )
+        password = await hash_password_async(new_password)
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(password=password)
+            .execution_options(synchronize_session=False)
+        )
+        # Committed with the new password, so old tokens stop working on every worker
+        await record_password_change(self.db, user_id)
         await self.db.commit()
-        await self.db.refresh(user)
+        await invalidate_principal(phone_number)
 
         return {"message": "Parol muvaffaqiyatli yangilandi"}
@@ -0,0 +1,290 @@
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models import SMSBroadcast, SMSBroadcastRecipient
+from src.schemas.sms_broadcast import BroadcastCreateRequest, BroadcastFilter
+from src.service import BasicCrud
+from src.service.amo_webhook import LEAD_STAGES
+from src.service.sms_outbox import SMS_STATUSES
+from sharq_models.models import User, AMOCrmLead, StudyInfo, Contract  # type: ignore
+from sharq_models.models.user import Role  # type: ignore
+
+
+BROADCAST_STATUSES = {
+    "PENDING": "pending",
+    "RUNNING": "running",
+    "DONE": "done",
+}
+
+
+def broadcast_sms_id(recipient_id: int) -> str:
+    """``user_sms_id`` of a broadcast SMS, prefixed so it never matches an outbox ID"""
+    return f"b{recipient_id}"
+
+
+def recipient_conditions(filters: BroadcastFilter) -> List[Any]:
+    """WHERE clauses on ``User`` selecting the applicants a broadcast goes to"""
+    conditions: List[Any] = [Role.name == "user"]
+
+    study_info = [
+        column == value
+        for column, value in (
+            (StudyInfo.study_direction_id, filters.study_direction_id),
+            (StudyInfo.study_form_id, filters.study_form_id),
+            (StudyInfo.study_type_id, filters.study_type_id),
+        )
+        if value is not None
+    ]
+    if study_info:
+        conditions.append(exists().where(StudyInfo.user_id == User.id, *study_info))
+    if filters.has_application is not None:
+        has_application = exists().where(StudyInfo.user_id == User.id)
+        conditions.append(has_application if filters.has_application else ~has_application)
+
+    if filters.has_contract is not None:
+        has_contract = exists().where(Contract.user_id == User.id)
+        conditions.append(has_contract if filters.has_contract else ~has_contract)
+
+    if filters.lead_stage is not None:
+        config = settings.amo_crm_config
+        lead_status = AMOCrmLead.lead_data["status"]
+        conditions.append(
+            exists().where(
+                AMOCrmLead.user_id == User.id,
+                lead_status["pipeline_id"].as_integer()
+                == config[f"{filters.lead_stage}_pipline_id"],
+                lead_status["status_id"].as_integer()
+                == config[f"{filters.lead_stage}_status_id"],
+            )
+        )
+
+    return conditions
+
+
+class SMSBroadcastService(BasicCrud[SMSBroadcast, BroadcastCreateRequest]):
+    """
+    Broadcasts to filtered applicants, kept in ``sms_broadcasts``.
+
+    Recipients are copied into ``sms_broadcast_recipients`` in keyset chunks
+    and sent from there, so a restarted worker resumes where it stopped.
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+
+    async def create_broadcast(
+        self, request: BroadcastCreateRequest, created_by: Optional[int] = None
+    ) -> SMSBroadcast:
+        stage = request.filters.lead_stage
+        if stage is not None and stage not in LEAD_STAGES.values():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Noto'g'ri ariza bosqichi",
+            )
+
+        broadcast = SMSBroadcast(
+            title=request.title,
+            message=request.message,
+            filters=request.filters.model_dump(exclude_none=True),
+            status=BROADCAST_STATUSES["PENDING"],
+            last_user_id=0,
+            total=0,
+            sent=0,
+            failed=0,
+            created_by=created_by,
+            created_at=datetime.now(),
+        )
+        self.db.add(broadcast)
+        await self.db.commit()
+        await self.db.refresh(broadcast)
+        return broadcast
+
+    async def get_broadcast(self, broadcast_id: int) -> SMSBroadcast:
+        broadcast = await self.get_by_id(SMSBroadcast, broadcast_id)
+        if broadcast is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Xabarnoma topilmadi",
+            )
+        return broadcast
+
+    async def get_recipients(
+        self,
+        broadcast_id: int,
+        recipient_status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> dict:
+        conditions = [SMSBroadcastRecipient.broadcast_id == broadcast_id]
+        if recipient_status:
+            conditions.append(SMSBroadcastRecipient.status == recipient_status)
+
+        total = await self.db.scalar(
+            select(func.count()).select_from(SMSBroadcastRecipient).where(*conditions)
+        )
+        result = await self.db.execute(
+            select(SMSBroadcastRecipient)
+            .where(*conditions)
+            .order_by(SMSBroadcastRecipient.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return {"total": total or 0, "items": list(result.scalars().all())}
+
+    async def claim(self, lease_seconds: int) -> Optional[SMSBroadcast]:
+        """Lease the oldest unfinished broadcast nobody else is working on"""
+        now = datetime.now()
+        stmt = (
+            select(SMSBroadcast)
+            .where(
+                SMSBroadcast.status != BROADCAST_STATUSES["DONE"],
+                or_(SMSBroadcast.lease_until.is_(None), SMSBroadcast.lease_until <= now),
+            )
+            .order_by(SMSBroadcast.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        broadcast = (await self.db.execute(stmt)).scalars().first()
+        if broadcast is not None:
+            broadcast.status = BROADCAST_STATUSES["RUNNING"]
+            broadcast.lease_until = now + timedelta(seconds=lease_seconds)
+        await self.db.commit()
+        return broadcast
+
+    async def extend_lease(self, broadcast_id: int, lease_seconds: int):
+        await self.db.execute(
+            update(SMSBroadcast)
+            .where(SMSBroadcast.id == broadcast_id)
+            .values(lease_until=datetime.now() + timedelta(seconds=lease_seconds))
+        )
+        await self.db.commit()
+
+    async def release(self, broadcast_id: int):
+        await self.db.execute(
+            update(SMSBroadcast)
+            .where(SMSBroadcast.id == broadcast_id)
+            .values(lease_until=None)
+        )
+        await self.db.commit()
+
+    async def collect_recipients(self, broadcast: SMSBroadcast, limit: int) -> int:
+        """
+        Copy the next ``limit`` matching applicants after ``last_user_id``.
+
+        The rows and the moved checkpoint commit together; 0 means every
+        recipient has been collected.
+        """
+        if broadcast.last_user_id is None:
+            return 0
+
+        filters = BroadcastFilter(**(broadcast.filters or {}))
+        rows = (
+            await self.db.execute(
+                select(User.id, User.phone_number)
+                .join(Role, Role.id == User.role_id)
+                .where(User.id > broadcast.last_user_id, *recipient_conditions(filters))
+                .order_by(User.id)
+                .limit(limit)
+            )
+        ).all()
+
+        if rows:
+            inserted = await self.db.execute(
+                insert(SMSBroadcastRecipient)
+                .values([
+                    {
+                        "broadcast_id": broadcast.id,
+                        "user_id": user_id,
+                        "phone_number": phone_number,
+                        "status": SMS_STATUSES["PENDING"],
+                    }
+                    for user_id, phone_number in rows
+                ])
+                .on_conflict_do_nothing(constraint="uq_sms_broadcast_recipients_broadcast_user")
+                .returning(SMSBroadcastRecipient.id)
+            )
+            added = len(inserted.all())
+            last_user_id = rows[-1][0]
+        else:
+            added = 0
+            last_user_id = None
+
+        await self.db.execute(
+            update(SMSBroadcast)
+            .where(SMSBroadcast.id == broadcast.id)
+            .values(last_user_id=last_user_id, total=SMSBroadcast.total + added)
+        )
+        await self.db.commit()
+
+        broadcast.last_user_id = last_user_id
+        return len(rows)
+
+    async def next_recipients(
+        self, broadcast_id: int, after_id: int, limit: int
+    ) -> List[SMSBroadcastRecipient]:
+        result = await self.db.execute(
+            select(SMSBroadcastRecipient)
+            .where(
+                SMSBroadcastRecipient.broadcast_id == broadcast_id,
+                SMSBroadcastRecipient.status == SMS_STATUSES["PENDING"],
+                SMSBroadcastRecipient.id > after_id,
+            )
+            .order_by(SMSBroadcastRecipient.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def mark_recipients(
+        self,
+        broadcast_id: int,
+        recipient_ids: List[int],
+        sent: bool,
+        error: Optional[str] = None,
+    ):
+        """Record one chunk's outcome and the broadcast counters in one transaction"""
+        result = await self.db.execute(
+            update(SMSBroadcastRecipient)
+            .where(
+                SMSBroadcastRecipient.id.in_(recipient_ids),
+                SMSBroadcastRecipient.status == SMS_STATUSES["PENDING"],
+            )
+            .values(
+                status=SMS_STATUSES["SENT"] if sent else SMS_STATUSES["FAILED"],
+                error=None if sent else (error or "")[:2000],
+                sent_at=datetime.now() if sent else None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        counter = SMSBroadcast.sent if sent else SMSBroadcast.failed
+        await self.db.execute(
+            update(SMSBroadcast)
+            .where(SMSBroadcast.id == broadcast_id)
+            .values({counter: counter + result.rowcount})
+        )
+        await self.db.commit()
+
+    async def finish(self, broadcast_id: int):
+        await self.db.execute(
+            update(SMSBroadcast)
+            .where(
+                SMSBroadcast.id == broadcast_id,
+                ~exists().where(
+                    and_(
+                        SMSBroadcastRecipient.broadcast_id == broadcast_id,
+                        SMSBroadcastRecipient.status == SMS_STATUSES["PENDING"],
+                    )
+                ),
+            )
+            .values(
+                status=BROADCAST_STATUSES["DONE"],
+                lease_until=None,
+                finished_at=datetime.now(),
+            )
+        )
+        await self.db.commit()
@@ -0,0 +1,106 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional
+
+from sqlalchemy import insert, select
+
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.models import SMSDeliveryReport, SMSOutboxMessage
+from src.utils.buffer import PeriodicFlushBuffer
+from src.utils.utils import phone_operator
+
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, "%Y-%m-%d %H:%M:%S")):
+        try:
+            return parse(str(value))
+        except ValueError:
+            continue
+    return None
+
+
+def parse_delivery_report(data: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Turn an Eskiz status callback into a ``sms_delivery_reports`` row.
+
+    ``user_sms_id`` is the ``sms_outbox_messages`` ID we sent the SMS with.
+    """
+    status = data.get("status")
+    if not status:
+        return None
+
+    phone_number = data.get("phone_number") or None
+    return {
+        "message_id": _parse_int(data.get("user_sms_id")),
+        "provider_request_id": str(data.get("request_id") or data.get("message_id") or "")[:64] or None,
+        "phone_number": phone_number,
+        "operator": phone_operator(phone_number) if phone_number else None,
+        "status": str(status)[:32],
+        "status_date": _parse_date(data.get("status_date")),
+        "received_at": datetime.now(),
+    }
+
+
+class DeliveryReportBuffer(PeriodicFlushBuffer):
+    """Collect Eskiz delivery reports and insert them with one statement per flush"""
+
+    def __init__(self, window: float = 2.0, max_size: int = 500):
+        super().__init__(window=window, max_size=max_size)
+        self._pending: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, report: Dict[str, Any]):
+        self._pending.append(report)
+        self._notify_if_full()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            reports, self._pending = self._pending, []
+
+            try:
+                async with AsyncSessionLocal() as session:
+                    message_ids = {r["message_id"] for r in reports if r["message_id"] is not None}
+                    sessions = {}
+                    if message_ids:
+                        result = await session.execute(
+                            select(SMSOutboxMessage.id, SMSOutboxMessage.session_id)
+                            .where(SMSOutboxMessage.id.in_(message_ids))
+                        )
+                        sessions = dict(result.all())
+
+                    rows = [
+                        {**report, "session_id": sessions.get(report["message_id"])}
+                        for report in reports
+                    ]
+                    await session.execute(insert(SMSDeliveryReport), rows)
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Failed to store {len(reports)} SMS delivery reports: {e}")
+                # Keep them for the next flush, but never grow past a few batches
+                self._pending = (reports + self._pending)[-self.max_size * 10:]
+                return 0
+
+            return len(rows)
+
+
+delivery_report_buffer = DeliveryReportBuffer(
+    window=settings.sms_delivery_flush_interval,
+    max_size=settings.sms_delivery_batch_size,
+)
@@ -0,0 +1,137 @@
+import logging
+import re
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import SMSOutboxMessage
+from src.service.sms_outbox import SMS_STATUSES
+from src.service.sms_session_store import SESSION_LIFETIME
+from sharq_models.models.user import SMSVerificationSession  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_TABLE = "sms_verification_session"
+_PARTITION_NAME = re.compile(rf"^{SESSION_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class SMSSessionMaintenance:
+    """Remove finished SMS verification sessions and keep the monthly partitions rolling"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def delete_expired_sessions(self, older_than: datetime, batch_size: int) -> int:
+        """Delete sessions expired before ``older_than`` in batches; return how many went"""
+        # Filtering on the partition key lets Postgres skip the current months
+        created_before = SMSVerificationSession.created_at < older_than - SESSION_LIFETIME
+        total = 0
+        while True:
+            batch = (
+                select(SMSVerificationSession.id)
+                .where(created_before)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await self.db.execute(
+                delete(SMSVerificationSession)
+                .where(created_before, SMSVerificationSession.id.in_(batch))
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                return total
+
+    async def delete_finished_messages(self, older_than: datetime, batch_size: int) -> int:
+        total = 0
+        while True:
+            batch = (
+                select(SMSOutboxMessage.id)
+                .where(
+                    SMSOutboxMessage.status.in_([SMS_STATUSES["SENT"], SMS_STATUSES["FAILED"]]),
+                    SMSOutboxMessage.created_at < older_than,
+                )
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await self.db.execute(
+                delete(SMSOutboxMessage)
+                .where(SMSOutboxMessage.id.in_(batch))
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                return total
+
+    async def is_partitioned(self) -> bool:
+        result = await self.db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table"
+            ),
+            {"table": SESSION_TABLE},
+        )
+        return result.scalar() is not None
+
+    async def _partition_months(self) -> List[date]:
+        result = await self.db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": SESSION_TABLE},
+        )
+        months = []
+        for name in result.scalars().all():
+            match = _PARTITION_NAME.match(name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    async def ensure_partitions(self, months_ahead: int) -> List[str]:
+        existing = set(await self._partition_months())
+        this_month = date.today().replace(day=1)
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            if month in existing:
+                continue
+            name = f"{SESSION_TABLE}_p{month:%Y%m}"
+            try:
+                await self.db.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF {SESSION_TABLE} "
+                        f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+                    )
+                )
+                await self.db.commit()
+                created.append(name)
+            except Exception as e:
+                # Fails if the default partition already holds rows for that month
+                await self.db.rollback()
+                logger.error(f"Failed to create partition {name}: {e}")
+        return created
+
+    async def drop_partitions_before(self, cutoff: datetime) -> List[str]:
+        """Drop whole months whose sessions all expired before ``cutoff``"""
+        dropped = []
+        for month in await self._partition_months():
+            if add_months(month, 1) > cutoff.date():
+                break
+            name = f"{SESSION_TABLE}_p{month:%Y%m}"
+            await self.db.execute(text(f"DROP TABLE {name}"))
+            await self.db.commit()
+            dropped.append(name)
+        return dropped
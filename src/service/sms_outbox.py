@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, update, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import SMSOutboxMessage
+
+
+SMS_STATUSES = {
+    "PENDING": "pending",
+    "PROCESSING": "processing",
+    "SENT": "sent",
+    "FAILED": "failed",
+}
+
+
+class SMSOutbox:
+    """Write and claim queued SMS stored in ``sms_outbox_messages``"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def enqueue(
+        self,
+        phone_number: str,
+        message: str,
+        session_id: Optional[int] = None,
+        expires_at: Optional[datetime] = None,
+    ) -> SMSOutboxMessage:
+        """Add a message to the current transaction; the caller commits it with its own rows"""
+        now = datetime.now()
+        sms = SMSOutboxMessage(
+            session_id=session_id,
+            phone_number=phone_number,
+            message=message,
+            status=SMS_STATUSES["PENDING"],
+            attempts=0,
+            available_at=now,
+            expires_at=expires_at,
+            created_at=now,
+        )
+        self.db.add(sms)
+        return sms
+
+    async def claim_batch(self, limit: int, lease_seconds: int) -> List[SMSOutboxMessage]:
+        """Lock the oldest due messages and lease them to this worker"""
+        now = datetime.now()
+        stmt = (
+            select(SMSOutboxMessage)
+            .where(
+                or_(
+                    SMSOutboxMessage.status == SMS_STATUSES["PENDING"],
+                    SMSOutboxMessage.status == SMS_STATUSES["PROCESSING"],
+                ),
+                SMSOutboxMessage.available_at <= now,
+            )
+            .order_by(SMSOutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(stmt)
+        messages = list(result.scalars().all())
+
+        lease_until = now + timedelta(seconds=lease_seconds)
+        for sms in messages:
+            sms.status = SMS_STATUSES["PROCESSING"]
+            sms.available_at = lease_until
+        await self.db.commit()
+
+        return messages
+
+    async def get_latest(self, phone_number: str) -> Optional[SMSOutboxMessage]:
+        stmt = (
+            select(SMSOutboxMessage)
+            .where(SMSOutboxMessage.phone_number == phone_number)
+            .order_by(SMSOutboxMessage.id.desc())
+            .limit(1)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def mark_sent(self, message_id: int, attempts: int):
+        await self.db.execute(
+            update(SMSOutboxMessage)
+            .where(SMSOutboxMessage.id == message_id)
+            .values(
+                status=SMS_STATUSES["SENT"],
+                attempts=attempts,
+                sent_at=datetime.now(),
+                last_error=None,
+            )
+        )
+        await self.db.commit()
+
+    async def mark_failed(
+        self,
+        message_id: int,
+        attempts: int,
+        error: str,
+        max_attempts: int,
+        backoff_seconds: float,
+        give_up: bool = False,
+    ):
+        """Reschedule with exponential backoff, or give up after ``max_attempts``"""
+        now = datetime.now()
+        if give_up or attempts >= max_attempts:
+            values = dict(status=SMS_STATUSES["FAILED"])
+        else:
+            delay = backoff_seconds * (2 ** (attempts - 1))
+            values = dict(
+                status=SMS_STATUSES["PENDING"],
+                available_at=now + timedelta(seconds=delay),
+            )
+
+        await self.db.execute(
+            update(SMSOutboxMessage)
+            .where(SMSOutboxMessage.id == message_id)
+            .values(attempts=attempts, last_error=error[:2000], **values)
+        )
+        await self.db.commit()
+
+    async def defer(self, message_id: int, delay: float):
+        """Put a leased message back without spending an attempt, e.g. while Eskiz is down"""
+        await self.db.execute(
+            update(SMSOutboxMessage)
+            .where(SMSOutboxMessage.id == message_id)
+            .values(
+                status=SMS_STATUSES["PENDING"],
+                available_at=datetime.now() + timedelta(seconds=delay),
+            )
+        )
+        await self.db.commit()
@@ -0,0 +1,271 @@
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+import sqlalchemy
+from sqlalchemy import select, update, and_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.kv import KVStore, get_kv_store
+from sharq_models.models.user import SMSVerificationSession  # type: ignore
+
+
+SESSION_BACKENDS = {
+    "POSTGRES": "postgres",
+    "KV": "kv",
+}
+
+# How long a code stays valid; also bounds ``created_at`` so lookups only touch the newest partition
+SESSION_LIFETIME = timedelta(minutes=10)
+
+VERIFY_RESULTS = {
+    "VERIFIED": "verified",
+    "WRONG_CODE": "wrong_code",
+    "NO_SESSION": "no_session",
+}
+
+
+@dataclass
+class VerificationSession:
+    phone_number: str
+    code: str
+    created_at: datetime
+    expires_at: datetime
+    attempts: int = 0
+    # Row ID for the Postgres backend, ``None`` in the key-value store
+    id: Optional[int] = None
+
+
+class VerificationSessionStore(ABC):
+    """Where active SMS verification codes live, one per phone number"""
+
+    @abstractmethod
+    async def create(
+        self, phone_number: str, code: str, created_at: datetime, expires_at: datetime
+    ) -> VerificationSession:
+        """Replace any active session of ``phone_number`` with a new one"""
+
+    @abstractmethod
+    async def get_active(self, phone_number: str) -> Optional[VerificationSession]: ...
+
+    @abstractmethod
+    async def verify(self, phone_number: str, code: str, defer_commit: bool = False) -> str:
+        """
+        Check ``code`` against the active session and return one of ``VERIFY_RESULTS``.
+
+        A match consumes the session and a miss counts an attempt, atomically, so
+        of two concurrent verifications only one can succeed. With ``defer_commit``
+        a match is left in the caller's transaction where the backend has one.
+        """
+
+    @abstractmethod
+    async def increment_attempts(self, phone_number: str) -> int: ...
+
+    @abstractmethod
+    async def mark_verified(self, phone_number: str): ...
+
+
+class PostgresSessionStore(VerificationSessionStore):
+    """
+    Sessions as ``sms_verification_session`` rows.
+
+    ``create`` only flushes, so the caller can commit other rows (the queued
+    SMS) in the same transaction.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _active(phone_number: str):
+        now = datetime.now()
+        return and_(
+            SMSVerificationSession.phone_number == phone_number,
+            SMSVerificationSession.verified == sqlalchemy.false(),
+            SMSVerificationSession.created_at > now - SESSION_LIFETIME,
+            SMSVerificationSession.expires_at > now,
+        )
+
+    def _active_id(self, phone_number: str):
+        return (
+            select(SMSVerificationSession.id)
+            .where(self._active(phone_number))
+            .order_by(SMSVerificationSession.created_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    async def _update_active(self, phone_number: str, returning, commit: bool = True, **values):
+        # Re-checking ``verified`` makes a concurrent update that already
+        # consumed the row match nothing instead of updating it twice
+        stmt = (
+            update(SMSVerificationSession)
+            .where(
+                SMSVerificationSession.id == self._active_id(phone_number),
+                SMSVerificationSession.verified == sqlalchemy.false(),
+            )
+            .values(**values)
+            .returning(returning)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        value = result.scalar_one_or_none()
+        if commit:
+            await self.db.commit()
+        return value
+
+    async def _get_row(self, phone_number: str) -> Optional[SMSVerificationSession]:
+        stmt = (
+            select(SMSVerificationSession)
+            .where(self._active(phone_number))
+            .order_by(SMSVerificationSession.created_at.desc())
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    @staticmethod
+    def _to_session(row: SMSVerificationSession) -> VerificationSession:
+        return VerificationSession(
+            phone_number=row.phone_number,
+            code=row.code,
+            created_at=row.created_at,
+            expires_at=row.expires_at,
+            attempts=row.attempts or 0,
+            id=row.id,
+        )
+
+    async def create(
+        self, phone_number: str, code: str, created_at: datetime, expires_at: datetime
+    ) -> VerificationSession:
+        await self.db.execute(
+            update(SMSVerificationSession)
+            .where(self._active(phone_number))
+            .values(verified=True)
+            .execution_options(synchronize_session=False)
+        )
+        row = SMSVerificationSession(
+            phone_number=phone_number,
+            code=code,
+            created_at=created_at,
+            expires_at=expires_at,
+            verified=False,
+        )
+        self.db.add(row)
+        await self.db.flush()
+        return self._to_session(row)
+
+    async def get_active(self, phone_number: str) -> Optional[VerificationSession]:
+        row = await self._get_row(phone_number)
+        return self._to_session(row) if row else None
+
+    async def verify(self, phone_number: str, code: str, defer_commit: bool = False) -> str:
+        matches = SMSVerificationSession.code == code
+        verified = await self._update_active(
+            phone_number,
+            SMSVerificationSession.verified,
+            commit=False,
+            verified=matches,
+            attempts=SMSVerificationSession.attempts + case((matches, 0), else_=1),
+        )
+        # A wrong guess is always counted, even if the caller rolls back afterwards
+        if not (verified and defer_commit):
+            await self.db.commit()
+        if verified is None:
+            return VERIFY_RESULTS["NO_SESSION"]
+        return VERIFY_RESULTS["VERIFIED"] if verified else VERIFY_RESULTS["WRONG_CODE"]
+
+    async def increment_attempts(self, phone_number: str) -> int:
+        attempts = await self._update_active(
+            phone_number,
+            SMSVerificationSession.attempts,
+            attempts=SMSVerificationSession.attempts + 1,
+        )
+        return attempts or 0
+
+    async def mark_verified(self, phone_number: str):
+        await self._update_active(phone_number, SMSVerificationSession.id, verified=True)
+
+
+class KVSessionStore(VerificationSessionStore):
+    """
+    Sessions as expiring keys, so OTP traffic never touches Postgres.
+
+    ``otp:session:<phone>`` holds the code and ``otp:attempts:<phone>`` the
+    wrong guesses; both expire with the session.
+    """
+
+    def __init__(self, kv: KVStore):
+        self.kv = kv
+
+    @staticmethod
+    def _keys(phone_number: str):
+        return f"otp:session:{phone_number}", f"otp:attempts:{phone_number}"
+
+    async def create(
+        self, phone_number: str, code: str, created_at: datetime, expires_at: datetime
+    ) -> VerificationSession:
+        session_key, attempts_key = self._keys(phone_number)
+        ttl = (expires_at - datetime.now()).total_seconds()
+        value = json.dumps({
+            "code": code,
+            "created_at": created_at.isoformat(),
+            "expires_at": expires_at.isoformat(),
+        })
+        await self.kv.delete(attempts_key)
+        await self.kv.set(session_key, value, ttl=ttl)
+        return VerificationSession(
+            phone_number=phone_number,
+            code=code,
+            created_at=created_at,
+            expires_at=expires_at,
+        )
+
+    async def get_active(self, phone_number: str) -> Optional[VerificationSession]:
+        session_key, attempts_key = self._keys(phone_number)
+        value = await self.kv.get(session_key)
+        if value is None:
+            return None
+
+        data = json.loads(value)
+        return VerificationSession(
+            phone_number=phone_number,
+            code=data["code"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            expires_at=datetime.fromisoformat(data["expires_at"]),
+            attempts=int(await self.kv.get(attempts_key) or 0),
+        )
+
+    async def verify(self, phone_number: str, code: str, defer_commit: bool = False) -> str:
+        # Keys cannot join a database transaction, a match is consumed right away
+        session = await self.get_active(phone_number)
+        if session is None:
+            return VERIFY_RESULTS["NO_SESSION"]
+        if session.code != code:
+            await self.increment_attempts(phone_number)
+            return VERIFY_RESULTS["WRONG_CODE"]
+
+        session_key, attempts_key = self._keys(phone_number)
+        # Only the caller that actually removes the key wins a concurrent race
+        if await self.kv.pop(session_key) is None:
+            return VERIFY_RESULTS["NO_SESSION"]
+        await self.kv.delete(attempts_key)
+        return VERIFY_RESULTS["VERIFIED"]
+
+    async def increment_attempts(self, phone_number: str) -> int:
+        session_key, attempts_key = self._keys(phone_number)
+        ttl = await self.kv.ttl(session_key)
+        if ttl is None:
+            return 0
+        return await self.kv.incr(attempts_key, ttl=ttl)
+
+    async def mark_verified(self, phone_number: str):
+        await self.kv.delete(*self._keys(phone_number))
+
+
+def get_session_store(db: AsyncSession) -> VerificationSessionStore:
+    if settings.sms_session_backend == SESSION_BACKENDS["KV"]:
+        return KVSessionStore(get_kv_store())
+    return PostgresSessionStore(db)
@@ -3,8 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sharq_models.models import StudyInfo, AMOCrmLead #type: ignore
 
 from src.schemas.passport_data import PassportDataResponse
-from src.core.config import settings
-from src.service.amo import update_lead_with_full_data, DealData
+from src.service.outbox import CRMOutbox, OUTBOX_EVENT_TYPES
 from src.schemas.study_info import (
     StudyInfoBase,
     StudyInfoCreate,
@@ -12,7 +11,7 @@ from src.schemas.study_info import (
 )
 from fastapi import HTTPException, status
 from typing import Any, Type
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, exists
 from sqlalchemy.orm import selectinload
 from sharq_models.database import Base #type: ignore
 from sharq_models.models import StudyLanguage, StudyForm, StudyDirection, StudyType, EducationType #type: ignore
@@ -40,27 +39,46 @@ DEAL_DATA_MAPPING = {
 }
 
 
+def format_graduate_year(graduate_year: Any) -> str:
+    if not graduate_year:
+        return "2025-01-01"
+        
+    year_str = str(graduate_year).strip()
+    
+    # If already in DD.MM.YYYY format, convert to YYYY-MM-DD
+    if re.match(r'^\d{2}\.\d{2}\.\d{4}$', year_str):
+        day, month, year = year_str.split('.')
+        return f"{year}-{month}-{day}"
+        
+    # If just year, assume June 1st
+    if re.match(r'^\d{4}$', year_str):
+        return f"{year_str}-06-01"
+        
+    return "2025-01-01"
+
+
+def build_lead_data(study_info: StudyInfo) -> dict:
+    """AmoCRM deal fields for a study info loaded with its related names"""
+    return {
+        "edu_lang_id": study_info.study_language.name if study_info.study_language else None,
+        "edu_type": study_info.study_type.name if study_info.study_type else None,
+        "edu_form": study_info.study_form.name if study_info.study_form else None,
+        "edu_direction": study_info.study_direction.name if study_info.study_direction else None,
+        "price": study_info.study_direction.contract_sum if study_info.study_direction else 0,
+        "admission_id": study_info.study_direction_id,
+        "edu_end_date": format_graduate_year(study_info.graduate_year),
+        "certificate_link": study_info.certificate_path,
+        "passport_file_link": study_info.dtm_sheet,
+    }
+
+
 class StudyInfoCrud(BasicCrud[StudyInfo, StudyInfoCreate]):
     def __init__(self, db: AsyncSession):
         super().__init__(db)
         self.lead_data = {}
         
     def _format_graduate_year(self, graduate_year: Any) -> str:
-        if not graduate_year:
-            return "2025-01-01"
-            
-        year_str = str(graduate_year).strip()
-        
-        # If already in DD.MM.YYYY format, convert to YYYY-MM-DD
-        if re.match(r'^\d{2}\.\d{2}\.\d{4}$', year_str):
-            day, month, year = year_str.split('.')
-            return f"{year}-{month}-{day}"
-            
-        # If just year, assume June 1st
-        if re.match(r'^\d{4}$', year_str):
-            return f"{year_str}-06-01"
-            
-        return "2025-01-01"
+        return format_graduate_year(graduate_year)
         
     async def _get_lead(self, user_id: int):
         lead = await super().get_by_field(
@@ -70,21 +88,7 @@ class StudyInfoCrud(BasicCrud[StudyInfo, StudyInfoCreate]):
 
     async def create_application(self, study_info: StudyInfoCreate):
         application = await self._create_study_info_if_not_exists(study_info=study_info)
-        lead = await self._get_lead(study_info.user_id)
-        if not lead:
-            print("Lead not found")
-            pass
-        else:
-            update_lead_with_full_data(
-                deal_id=lead.lead_id,
-                deal_data=DealData(**{
-                    "name": f"{lead.contact_data.get('first_name', '')} {lead.contact_data.get('last_name', '')}",
-                    "contact_id": lead.contact_id,
-                    **self.lead_data,
-                }),
-                config_data=settings.amo_crm_config,
-            )
-        
+
         return {
             "message": "Ariza muvaffaqiyatli yaratildi!",
             "application": application
@@ -118,7 +122,13 @@ class StudyInfoCrud(BasicCrud[StudyInfo, StudyInfoCreate]):
         self.lead_data["edu_end_date"] = self._format_graduate_year(study_info.graduate_year)
         self.lead_data["certificate_link"] = study_info.certificate_path
         self.lead_data["passport_file_link"] = study_info.dtm_sheet
-        
+
+        # Committed together with the StudyInfo row by ``create`` below
+        CRMOutbox(self.db).enqueue(
+            user_id=study_info.user_id,
+            event_type=OUTBOX_EVENT_TYPES["FULL_DATA"],
+            payload={"lead_data": self.lead_data},
+        )
         await super().create(model=StudyInfo, obj_items=study_info)
         
         application_data = await self._get_with_join(study_info.user_id)
@@ -219,9 +229,7 @@ class StudyInfoCrud(BasicCrud[StudyInfo, StudyInfoCreate]):
     
     
     async def get_user_application_status(self, user_id: int):
-        user_data = await super().get_by_field(model=StudyInfo , field_name="user_id", field_value=user_id)
-        if not user_data:
-            return False
-        if user_data:
-            return True
+        # Only the local row counts: the AmoCRM stage can run ahead of it, and the
+        # detail endpoints need the row
+        return bool(await self.db.scalar(select(exists().where(StudyInfo.user_id == user_id))))
         
\ No newline at end of file
@@ -1,6 +1,8 @@
 __all__ = (
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
     "create_access_token",
     "authenticate_user",
     "get_current_user",
@@ -13,6 +15,8 @@ __all__ = (
 from .auth import (
     hash_password,
     verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     authenticate_user,
     get_current_user,
@@ -1,6 +1,6 @@
 import jwt
 from datetime import timedelta, timezone, datetime
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
 from fastapi import HTTPException, status
 from fastapi.params import Depends
@@ -15,14 +15,25 @@ from passlib.context import CryptContext
 from pydantic import ValidationError
 from jwt.exceptions import InvalidTokenError
 
-from src.schemas.user import TokenData
+from src.schemas.user import CurrentUser, TokenData
 from src.core.config import settings
 from src.core.db import get_db
+from src.utils.executor import BoundedExecutor, ExecutorBusyError
+from src.utils.phone_index import phone_exists
+from src.utils.principal import cache_principal, get_cached_principal, get_password_changed_at
+from src.utils.rate_limit import limit_otp_sends
 from sharq_models.models import User #type: ignore
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a few threads hash in parallel while the event loop keeps serving
+password_executor = BoundedExecutor(
+    "bcrypt",
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
+
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/auth/login",
 )
@@ -36,11 +47,33 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _password_executor_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server band, birozdan so'ng qayta urinib ko'ring",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def hash_password_async(plain_password: str) -> str:
+    try:
+        return await password_executor.run(pwd_context.hash, plain_password)
+    except ExecutorBusyError:
+        raise _password_executor_busy()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_executor.run(pwd_context.verify, plain_password, hashed_password)
+    except ExecutorBusyError:
+        raise _password_executor_busy()
+
+
 async def authenticate_user(db: AsyncSession, username: str, password: str):
     user_data = await get_user(db=db, username=username)
     if not user_data:
         return None
-    if not verify_password(plain_password=password, hashed_password=user_data.password):
+    if not await verify_password_async(plain_password=password, hashed_password=user_data.password):
         return None
     return user_data
 
@@ -54,10 +87,27 @@ async def get_user(db: AsyncSession, username: str):
     return result.scalars().first()
 
 
+async def load_principal(db: AsyncSession, username: str) -> Optional[CurrentUser]:
+    user = await get_user(db=db, username=username)
+    if user is None:
+        return None
+
+    principal = CurrentUser(
+        id=user.id,
+        phone_number=user.phone_number,
+        role_id=user.role_id,
+        role_name=user.role.name if user.role else None,
+        password_changed_at=await get_password_changed_at(db, user.id),
+    )
+    await cache_principal(principal)
+    return principal
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: AsyncSession = Depends(get_db),
-):
+) -> CurrentUser:
+    """The caller from the principal cache, loading it from the database at most once per TTL"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -76,11 +126,17 @@ async def get_current_user(
     except (InvalidTokenError, ValidationError):
         raise credentials_exception
 
-    user = await get_user(db=db, username=token_data.username)
-    if user is None:
+    principal = await get_cached_principal(token_data.username)
+    if principal is None:
+        principal = await load_principal(db, token_data.username)
+    if principal is None:
         raise credentials_exception
 
-    return user
+    # Tokens from before a password reset stop working; old tokens carry no ``iat``
+    if float(payload.get("iat") or 0) < principal.password_changed_at:
+        raise credentials_exception
+
+    return principal
 
 
 async def get_current_user_with_role(
@@ -90,12 +146,12 @@ async def get_current_user_with_role(
 ):
     user = await get_current_user(token=token, db=db)
 
-    if not user.role:
+    if not user.role_name:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Foydalanuvchiga hech qanday rol biriktirilmagan"
         )
 
-    if user.role.name not in required_roles:
+    if user.role_name not in required_roles:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Kirish rad etildi. Talab qilinadigan rollar: {required_roles}",
@@ -106,10 +162,12 @@ async def get_current_user_with_role(
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(
         days=settings.access_token_expire_minutes
     )
-    to_encode.update({"exp": expire})
+    # Sub-second ``iat`` so a token issued right after a password reset is still newer
+    to_encode.update({"exp": expire, "iat": now.timestamp()})
     encoded_jwt = jwt.encode(
         to_encode, settings.access_secret_key, algorithm=settings.algorithm
     )
@@ -127,14 +185,11 @@ def require_roles(required_roles: List[str]):
 
 
 async def check_phone_not_exists(
-    request: SendVerificationCodeRequest,
+    request: Annotated[SendVerificationCodeRequest, Depends(limit_otp_sends)],
     db: AsyncSession = Depends(get_db)
 ) -> SendVerificationCodeRequest:
-    stmt = select(User).where(User.phone_number == request.phone_number)
-    result = await db.execute(stmt)
-    existing_user = result.scalars().first()
-
-    if existing_user:
+    # A stale "not registered" only costs an SMS, registration checks the database again
+    if await phone_exists(db, request.phone_number, trust_negative=True):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"{request.phone_number} raqamli telefon allaqachon ro'yxatdan o'tgan."
@@ -143,14 +198,10 @@ async def check_phone_not_exists(
     return request
 
 async def check_phone_for_exists(
-    request: SendVerificationCodeRequest,
+    request: Annotated[SendVerificationCodeRequest, Depends(limit_otp_sends)],
     db: AsyncSession = Depends(get_db)
 ):
-    stmt = select(User).where(User.phone_number == request.phone_number)
-    result = await db.execute(stmt)
-    existing_user = result.scalars().first()
-
-    if not existing_user:
+    if not await phone_exists(db, request.phone_number):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"{request.phone_number} raqamli telefon ro'yxatdan o'tmagan."
@@ -0,0 +1,51 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class PeriodicFlushBuffer(ABC):
+    """
+    Base for in-memory write buffers that are flushed every ``window`` seconds,
+    or as soon as ``max_size`` items are waiting. Subclasses implement ``flush``.
+    """
+
+    def __init__(self, window: float = 1.0, max_size: int = 200):
+        self.window = window
+        self.max_size = max_size
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    def _notify_if_full(self):
+        if len(self) >= self.max_size:
+            self._wakeup.set()
+
+    @abstractmethod
+    async def flush(self) -> int:
+        """Write everything buffered so far and return how many items went out"""
+
+    def start(self):
+        async def flush_forever():
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(flush_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
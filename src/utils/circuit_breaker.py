@@ -0,0 +1,137 @@
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+
+from src.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+UPSTREAMS = {
+    "AMOCRM": "amocrm",
+    "SMS": "sms",
+    "PASSPORT": "passport",
+    "FILE_SERVER": "file_server",
+}
+
+CIRCUIT_STATES = {
+    "CLOSED": "closed",
+    "OPEN": "open",
+    "HALF_OPEN": "half_open",
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Stop calling an upstream after ``failure_threshold`` consecutive failures.
+
+    The circuit stays open for ``recovery_timeout`` seconds, then lets up to
+    ``half_open_max_calls`` probe calls through: a successful probe closes it,
+    a failed one opens it again. A probe that never reports back is given up
+    after ``recovery_timeout`` so its slot goes to the next caller.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CIRCUIT_STATES["CLOSED"]
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started_at = 0.0
+
+    @property
+    def retry_after(self) -> float:
+        if self.state != CIRCUIT_STATES["OPEN"]:
+            return 0.0
+        return max(self._opened_at + self.recovery_timeout - time.monotonic(), 0.0)
+
+    def is_open(self) -> bool:
+        return self.state == CIRCUIT_STATES["OPEN"] and self.retry_after > 0
+
+    def before_call(self):
+        """Raise ``CircuitOpenError`` unless the upstream may be called now"""
+        if self.state == CIRCUIT_STATES["OPEN"]:
+            if self.retry_after > 0:
+                raise CircuitOpenError(self.name, self.retry_after)
+            self.state = CIRCUIT_STATES["HALF_OPEN"]
+            self._probes = 0
+
+        if self.state == CIRCUIT_STATES["HALF_OPEN"]:
+            now = time.monotonic()
+            if self._probes >= self.half_open_max_calls:
+                waited = now - self._probe_started_at
+                if waited < self.recovery_timeout:
+                    raise CircuitOpenError(self.name, self.recovery_timeout - waited)
+                logger.warning(f"Circuit {self.name} probe never reported back, releasing it")
+                self._probes = 0
+            self._probes += 1
+            self._probe_started_at = now
+
+    def record_success(self):
+        if self.state != CIRCUIT_STATES["CLOSED"]:
+            logger.info(f"Circuit {self.name} closed")
+        self.state = CIRCUIT_STATES["CLOSED"]
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if (
+            self.state == CIRCUIT_STATES["HALF_OPEN"]
+            or self.failures >= self.failure_threshold
+        ):
+            if self.state != CIRCUIT_STATES["OPEN"]:
+                logger.warning(
+                    f"Circuit {self.name} opened after {self.failures} failures "
+                    f"for {self.recovery_timeout}s"
+                )
+            self.state = CIRCUIT_STATES["OPEN"]
+            self._opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return this worker's breaker for ``name``, configured from settings"""
+    breaker: Optional[CircuitBreaker] = _breakers.get(name)
+    if breaker is None:
+        options = {
+            "failure_threshold": settings.circuit_failure_threshold,
+            "recovery_timeout": settings.circuit_recovery_timeout,
+            "half_open_max_calls": settings.circuit_half_open_max_calls,
+            **settings.circuit_breaker_overrides.get(name, {}),
+        }
+        breaker = CircuitBreaker(name, **options)
+        _breakers[name] = breaker
+    return breaker
+
+
+def circuit_open_exception(error: CircuitOpenError, detail: str) -> HTTPException:
+    """503 answer for a request that needs an upstream whose circuit is open"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusyError(Exception):
+    """Raised instead of queueing more work on a saturated ``BoundedExecutor``"""
+
+    def __init__(self, name: str, pending: int):
+        super().__init__(f"{name} executor is busy with {pending} calls")
+        self.name = name
+        self.pending = pending
+
+
+class BoundedExecutor:
+    """
+    Thread pool for blocking CPU work, such as bcrypt, called from async code.
+
+    At most ``max_workers`` calls run at once and ``max_queue`` more may wait;
+    beyond that ``run`` fails fast with ``ExecutorBusyError`` instead of letting
+    the backlog grow. Time spent waiting for a thread is tracked in ``stats``.
+
+    A call counts as pending until its thread finishes, even when the awaiting
+    request was cancelled, since bcrypt cannot be interrupted.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, slow_queue_time: float = 1.0):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.slow_queue_time = slow_queue_time
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+        self.pending = 0
+        self._pending_lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+        self.total_run_time = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ExecutorBusyError(self.name, self.pending)
+
+        submitted = time.monotonic()
+
+        def call():
+            started = time.monotonic()
+            result = fn(*args)
+            return result, started - submitted, time.monotonic() - started
+
+        with self._pending_lock:
+            self.pending += 1
+        future = self._executor.submit(call)
+        future.add_done_callback(self._call_done)
+        result, queue_time, run_time = await asyncio.wrap_future(future)
+
+        self.completed += 1
+        self.total_queue_time += queue_time
+        self.max_queue_time = max(self.max_queue_time, queue_time)
+        self.total_run_time += run_time
+        if queue_time >= self.slow_queue_time:
+            logger.warning(
+                f"{self.name} call waited {queue_time:.2f}s for a thread, {self.pending} pending"
+            )
+        return result
+
+    def _call_done(self, future):
+        # Runs on the worker thread, or right away if the call was cancelled before starting
+        with self._pending_lock:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_queue_time": self.total_queue_time / self.completed if self.completed else 0.0,
+            "max_queue_time": self.max_queue_time,
+            "avg_run_time": self.total_run_time / self.completed if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from sharq_models.models import User  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+
+class PhoneIndex:
+    """
+    Registered phone numbers, kept in memory to answer existence checks.
+
+    Every answer is only trusted for ``ttl`` seconds, because other workers
+    register, delete and renumber users without telling this one. A phone in
+    the index is registered until its entry expires. A phone missing from it
+    is only known to be unregistered while the last full load is younger than
+    ``ttl`` and every user fitted under ``max_size``; ``start`` reloads it in
+    the background so that stays true. Callers that need certainty fall back
+    to the database.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._complete_until = 0.0
+        self._phones: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def complete(self) -> bool:
+        return time.monotonic() < self._complete_until
+
+    def add(self, phone_number: str):
+        if phone_number not in self._phones and len(self._phones) >= self.max_size:
+            self._complete_until = 0.0
+            return
+        self._phones[phone_number] = time.monotonic() + self.ttl
+
+    def discard(self, phone_number: str):
+        self._phones.pop(phone_number, None)
+
+    def lookup(self, phone_number: str) -> Optional[bool]:
+        """``True`` if registered, ``False`` if probably not, ``None`` if unknown"""
+        expires_at = self._phones.get(phone_number)
+        if expires_at is not None:
+            if time.monotonic() < expires_at:
+                return True
+            self.discard(phone_number)
+        return False if self.complete else None
+
+    async def warm(self, db: AsyncSession):
+        loaded_at = time.monotonic()
+        expires_at = loaded_at + self.ttl
+        phones: Dict[str, float] = {}
+        complete = True
+
+        rows = await db.stream_scalars(
+            select(User.phone_number).execution_options(yield_per=10000)
+        )
+        async for phone_number in rows:
+            if len(phones) >= self.max_size:
+                complete = False
+                break
+            phones[phone_number] = expires_at
+
+        # Swapped in whole, so lookups never see a half-loaded index
+        self._phones = phones
+        self._complete_until = expires_at if complete else 0.0
+        logger.info(f"Phone index loaded {len(phones)} numbers, complete: {complete}")
+
+    def start(self, session_factory: Callable[[], AsyncSession]):
+        """Reload from the database a little more often than entries expire"""
+        async def refresh_forever():
+            while True:
+                await asyncio.sleep(self.ttl * 0.8)
+                try:
+                    async with session_factory() as session:
+                        await self.warm(session)
+                except Exception as e:
+                    logger.error(f"Phone index refresh failed: {e}")
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(refresh_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def __len__(self):
+        return len(self._phones)
+
+
+phone_index = PhoneIndex(
+    max_size=settings.phone_index_max_size, ttl=settings.phone_index_ttl
+)
+
+
+async def phone_exists(db: AsyncSession, phone_number: str, trust_negative: bool = False) -> bool:
+    """
+    Whether a user has ``phone_number``, from ``phone_index`` when it can tell.
+
+    ``trust_negative`` accepts the index's "probably not" where a later step
+    checks again anyway, e.g. before sending a registration code.
+    """
+    known = phone_index.lookup(phone_number)
+    if known or (known is False and trust_negative):
+        return known
+
+    found = await db.scalar(select(exists().where(User.phone_number == phone_number)))
+    if found:
+        phone_index.add(phone_number)
+    return bool(found)
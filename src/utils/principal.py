@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.kv import get_kv_store
+from src.models import UserPasswordChange
+from src.schemas.user import CurrentUser
+
+
+def _principal_key(phone_number: str) -> str:
+    return f"auth:principal:{phone_number}"
+
+
+async def get_cached_principal(phone_number: str) -> Optional[CurrentUser]:
+    value = await get_kv_store().get(_principal_key(phone_number))
+    return CurrentUser.model_validate_json(value) if value else None
+
+
+async def cache_principal(principal: CurrentUser):
+    await get_kv_store().set(
+        _principal_key(principal.phone_number),
+        principal.model_dump_json(),
+        ttl=settings.auth_principal_ttl,
+    )
+
+
+async def invalidate_principal(phone_number: str):
+    """Drop the cached user, e.g. after its role changed"""
+    await get_kv_store().delete(_principal_key(phone_number))
+
+
+async def get_password_changed_at(db: AsyncSession, user_id: int) -> float:
+    changed_at = await db.scalar(
+        select(UserPasswordChange.changed_at).where(UserPasswordChange.user_id == user_id)
+    )
+    return changed_at.replace(tzinfo=timezone.utc).timestamp() if changed_at else 0.0
+
+
+async def record_password_change(db: AsyncSession, user_id: int):
+    """Reject tokens issued before now; joins the caller's transaction"""
+    changed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    await db.execute(
+        insert(UserPasswordChange)
+        .values(user_id=user_id, changed_at=changed_at)
+        .on_conflict_do_update(
+            index_elements=[UserPasswordChange.user_id],
+            set_={"changed_at": changed_at},
+        )
+    )
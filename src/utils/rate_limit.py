@@ -0,0 +1,192 @@
+import math
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+from src.core.config import settings
+from src.core.kv import KVStore, get_kv_store
+from src.schemas.sms import SendVerificationCodeRequest
+from src.utils.utils import normalize_phone
+
+
+class SlidingWindowLimiter:
+    """
+    Allow ``limit`` hits per ``window`` seconds for each key.
+
+    Uses the sliding-window counter approximation: the previous fixed window's
+    count is weighted by how much of it still overlaps the sliding window. Two
+    counters per key keep it cheap in any ``KVStore``.
+    """
+
+    def __init__(self, name: str, limit: int, window: float, kv: Optional[KVStore] = None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self._kv = kv
+
+    @property
+    def kv(self) -> KVStore:
+        return self._kv or get_kv_store()
+
+    async def hit(self, key: str) -> Optional[float]:
+        """Count a hit; return seconds to wait if it is over the limit, else ``None``"""
+        now = time.time()
+        bucket = int(now // self.window)
+        elapsed = now - bucket * self.window
+
+        current = await self.kv.incr(f"rl:{self.name}:{key}:{bucket}", ttl=self.window * 2)
+        previous = int(await self.kv.get(f"rl:{self.name}:{key}:{bucket - 1}") or 0)
+        overlap = 1 - elapsed / self.window
+        if previous * overlap + current <= self.limit:
+            return None
+
+        if current > self.limit:
+            # Only the next window brings this key back under the limit
+            return self.window - elapsed
+        # Wait until enough of the previous window has slid out
+        return max(self.window * (1 - (self.limit - current) / previous) - elapsed, 1.0)
+
+
+class LockoutLimiter:
+    """
+    Allow ``free_attempts`` attempts per key, then one attempt per lockout of
+    ``base_lockout`` seconds, doubling with every further attempt up to
+    ``max_lockout``.
+
+    Attempts are reserved before they run, so concurrent requests cannot all
+    slip in before the lock is set; a successful one is given back with
+    ``release`` or clears the key with ``reset``. Counts are forgotten
+    ``window`` seconds after the first attempt and live in the shared
+    ``KVStore`` so every worker sees them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        free_attempts: int,
+        base_lockout: float,
+        max_lockout: float,
+        window: float,
+        kv: Optional[KVStore] = None,
+    ):
+        self.name = name
+        self.free_attempts = free_attempts
+        self.base_lockout = base_lockout
+        self.max_lockout = max_lockout
+        self.window = window
+        self._kv = kv
+
+    @property
+    def kv(self) -> KVStore:
+        return self._kv or get_kv_store()
+
+    def _keys(self, key: str):
+        return f"lo:{self.name}:{key}:failures", f"lo:{self.name}:{key}:locked"
+
+    async def locked_for(self, key: str) -> Optional[float]:
+        """Seconds until ``key`` may try again, ``None`` if it is not locked"""
+        _, locked_key = self._keys(key)
+        return await self.kv.ttl(locked_key)
+
+    async def reserve(self, key: str) -> Optional[float]:
+        """Count an attempt; return seconds to wait if it must not run, else ``None``"""
+        retry_after = await self.locked_for(key)
+        if retry_after is not None:
+            return retry_after
+
+        failures_key, locked_key = self._keys(key)
+        attempts = await self.kv.incr(failures_key, ttl=self.window)
+        if attempts <= self.free_attempts:
+            return None
+
+        lockout = min(
+            self.base_lockout * 2 ** (attempts - self.free_attempts - 1), self.max_lockout
+        )
+        # Only the request that sets the lock gets to try
+        if await self.kv.add(locked_key, "1", ttl=lockout):
+            return None
+        await self.release(key)
+        return await self.locked_for(key) or lockout
+
+    async def release(self, key: str):
+        """Give back an attempt reserved by a request that turned out fine"""
+        failures_key, _ = self._keys(key)
+        await self.kv.incr(failures_key, ttl=self.window, amount=-1)
+
+    async def reset(self, key: str):
+        await self.kv.delete(*self._keys(key))
+
+
+otp_phone_limiter = SlidingWindowLimiter(
+    "otp_phone", settings.otp_rate_phone_limit, settings.otp_rate_phone_window
+)
+otp_ip_limiter = SlidingWindowLimiter(
+    "otp_ip", settings.otp_rate_ip_limit, settings.otp_rate_ip_window
+)
+
+
+login_phone_limiter = LockoutLimiter(
+    "login_phone",
+    free_attempts=settings.login_phone_free_attempts,
+    base_lockout=settings.login_base_lockout,
+    max_lockout=settings.login_max_lockout,
+    window=settings.login_failure_window,
+)
+login_ip_limiter = LockoutLimiter(
+    "login_ip",
+    free_attempts=settings.login_ip_free_attempts,
+    base_lockout=settings.login_base_lockout,
+    max_lockout=settings.login_max_lockout,
+    window=settings.login_failure_window,
+)
+
+
+def get_client_ip(request: Request) -> str:
+    header = settings.forwarded_ip_header
+    if header and request.headers.get(header):
+        # The last hop is the one our own proxy appended, earlier ones are client-supplied
+        return request.headers[header].split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def too_many_requests(retry_after: float) -> HTTPException:
+    seconds = math.ceil(retry_after)
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"Juda ko'p urinish. {seconds} soniyadan keyin qayta urinib ko'ring",
+        headers={"Retry-After": str(seconds)},
+    )
+
+
+async def limit_otp_sends(
+    request: Request, body: SendVerificationCodeRequest
+) -> SendVerificationCodeRequest:
+    """Throttle OTP sends per phone and per client IP before any DB or Eskiz work"""
+    for limiter, key in (
+        (otp_ip_limiter, get_client_ip(request)),
+        (otp_phone_limiter, normalize_phone(body.phone_number)),
+    ):
+        retry_after = await limiter.hit(key)
+        if retry_after is not None:
+            raise too_many_requests(retry_after)
+    return body
+
+
+async def reserve_login_attempt(phone_number: str, client_ip: str):
+    """Count a login against its IP and phone before any DB or bcrypt work, or refuse it"""
+    retry_after = await login_ip_limiter.reserve(client_ip)
+    if retry_after is not None:
+        raise too_many_requests(retry_after)
+
+    retry_after = await login_phone_limiter.reserve(phone_number)
+    if retry_after is not None:
+        await login_ip_limiter.release(client_ip)
+        raise too_many_requests(retry_after)
+
+
+async def record_login_success(phone_number: str, client_ip: str):
+    await login_phone_limiter.reset(phone_number)
+    # Only this attempt is given back; earlier failures from the IP still count,
+    # or one valid account would unlock guessing for others
+    await login_ip_limiter.release(client_ip)
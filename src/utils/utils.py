@@ -1,4 +1,5 @@
 import os
+import re
 from uuid import uuid4
 import qrcode
 import random
@@ -27,3 +28,41 @@ def generate_qr_code(data: str, save_path: str) -> None:
 
 def generate_contract_id(length: int = 6) -> str:
     return ''.join(random.choices('0123456789', k=length))
+
+
+
+def normalize_phone(phone: str) -> str:
+    """Reduce a phone number to bare digits with the 998 country code"""
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) == 9:
+        digits = f"998{digits}"
+    return digits
+
+
+def phone_variants(phone: str) -> list[str]:
+    """Spellings under which the same number may have been stored"""
+    digits = normalize_phone(phone)
+    return list(dict.fromkeys([phone, digits, f"+{digits}"]))
+
+
+# Uzbek mobile operators by the two digits after 998
+PHONE_OPERATORS = {
+    "90": "beeline",
+    "91": "beeline",
+    "93": "ucell",
+    "94": "ucell",
+    "50": "ucell",
+    "97": "mobiuz",
+    "88": "mobiuz",
+    "95": "uzmobile",
+    "99": "uzmobile",
+    "77": "uzmobile",
+    "33": "humans",
+}
+
+
+def phone_operator(phone: str) -> str:
+    digits = normalize_phone(phone)
+    if not digits.startswith("998"):
+        return "unknown"
+    return PHONE_OPERATORS.get(digits[3:5], "unknown")
@@ -0,0 +1,136 @@
+"""
+Create missing AmoCRM leads and push data that never reached AmoCRM.
+
+    python -m src.workers.amo_reconcile                  # resume from the checkpoint
+    python -m src.workers.amo_reconcile --reset          # rescan every applicant
+    python -m src.workers.amo_reconcile --include-stale  # also re-push unsynced passport/study data
+    python -m src.workers.amo_reconcile --dry-run        # only report what would be pushed
+
+Re-pushing study data moves the lead back to the "accepted" stage, which is why
+stale leads are only repaired on request.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.core.model_config import configure_models
+from src.service.amo import AmoCRMService, close_amocrm_service, init_amocrm_service
+from src.service.crm_reconcile import CRMReconcileService, ReconcileItem
+from src.utils.circuit_breaker import CircuitOpenError
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_checkpoint(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as checkpoint:
+        return int(json.load(checkpoint).get("last_user_id", 0))
+
+
+def save_checkpoint(path: str, last_user_id: int):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as checkpoint:
+        json.dump({"last_user_id": last_user_id, "saved_at": time.time()}, checkpoint)
+    os.replace(tmp_path, path)
+
+
+async def repair_item(
+    item: ReconcileItem,
+    amo_service: AmoCRMService,
+    semaphore: asyncio.Semaphore,
+    stats: Counter,
+) -> bool:
+    async with semaphore, AsyncSessionLocal() as session:
+        while True:
+            try:
+                await CRMReconcileService(session).repair(item, amo_service)
+                stats["repaired"] += 1
+                return True
+            except CircuitOpenError as e:
+                # Every step is safe to repeat, so wait for AmoCRM and start over
+                await session.rollback()
+                await asyncio.sleep(e.retry_after or 1.0)
+                continue
+            except Exception as e:
+                await session.rollback()
+                stats["failed"] += 1
+                logger.error(f"Failed to reconcile user {item.user_id}: {e}")
+                return False
+
+
+async def run(args: argparse.Namespace):
+    configure_models()
+    amo_service = await init_amocrm_service(settings.amo_crm_config)
+    # Enough in-flight applicants to fill AmoCRM bulk batches
+    semaphore = asyncio.Semaphore(args.concurrency)
+    stats = Counter()
+
+    last_user_id = 0 if args.reset else load_checkpoint(args.checkpoint)
+    # The checkpoint never moves past a failed user, so the next run retries it;
+    # users repaired since then are skipped because nothing is missing any more
+    checkpoint = None
+    started = time.monotonic()
+    logger.info(f"Reconciling AmoCRM leads after user {last_user_id}")
+
+    try:
+        while True:
+            async with AsyncSessionLocal() as session:
+                items, scanned_to = await CRMReconcileService(session).fetch_chunk(
+                    after_user_id=last_user_id,
+                    limit=args.chunk_size,
+                    include_stale=args.include_stale,
+                )
+            if scanned_to is None:
+                break
+
+            for item in items:
+                stats.update(item.actions)
+
+            if not args.dry_run:
+                repaired = await asyncio.gather(
+                    *(repair_item(item, amo_service, semaphore, stats) for item in items)
+                )
+                failed = [item.user_id for item, ok in zip(items, repaired) if not ok]
+                if failed and checkpoint is None:
+                    checkpoint = min(failed) - 1
+
+            last_user_id = scanned_to
+            stats["scanned_chunks"] += 1
+            if not args.dry_run:
+                save_checkpoint(
+                    args.checkpoint, last_user_id if checkpoint is None else checkpoint
+                )
+
+            logger.info(
+                f"Reconciled up to user {last_user_id} in {time.monotonic() - started:.1f}s: "
+                f"{dict(stats)} | AmoCRM limiter: {amo_service.rate_limiter.stats()}"
+            )
+    finally:
+        await close_amocrm_service()
+
+    logger.info(f"Reconciliation finished: {dict(stats)}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--checkpoint", default=".cache/amo_reconcile.json")
+    parser.add_argument("--reset", action="store_true")
+    parser.add_argument("--include-stale", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
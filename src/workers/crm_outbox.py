@@ -0,0 +1,101 @@
+"""
+Drain ``crm_outbox_events`` into AmoCRM.
+
+Run as a separate process next to the API workers::
+
+    python -m src.workers.crm_outbox
+"""
+import asyncio
+import logging
+
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.core.model_config import configure_models
+from src.models import CRMOutboxEvent
+from src.service.amo import AmoCRMService, close_amocrm_service, init_amocrm_service
+from src.service.crm_sync import CRMSyncService
+from src.service.outbox import CRMOutbox
+from src.utils.circuit_breaker import CircuitOpenError
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def process_event(
+    event: CRMOutboxEvent, amo_service: AmoCRMService, semaphore: asyncio.Semaphore
+):
+    async with semaphore, AsyncSessionLocal() as session:
+        attempts = event.attempts + 1
+        try:
+            await CRMSyncService(session, amo_service).handle(event)
+        except CircuitOpenError as e:
+            await session.rollback()
+            logger.info(f"Outbox event {event.id} deferred: {e}")
+            await CRMOutbox(session).defer(event.id, e.retry_after)
+            return
+        except Exception as e:
+            await session.rollback()
+            logger.warning(
+                f"Outbox event {event.id} ({event.event_type}) for user {event.user_id} "
+                f"failed on attempt {attempts}: {e}"
+            )
+            await CRMOutbox(session).mark_failed(
+                event.id,
+                attempts=attempts,
+                error=str(e),
+                max_attempts=settings.crm_outbox_max_attempts,
+                backoff_seconds=settings.crm_outbox_backoff_seconds,
+            )
+            if attempts >= settings.crm_outbox_max_attempts:
+                logger.error(f"Outbox event {event.id} moved to dead letter")
+            return
+
+        await CRMOutbox(session).mark_done(event.id)
+
+
+async def drain_once(amo_service: AmoCRMService, semaphore: asyncio.Semaphore) -> int:
+    async with AsyncSessionLocal() as session:
+        events = await CRMOutbox(session).claim_batch(
+            limit=settings.crm_outbox_batch_size,
+            lease_seconds=settings.crm_outbox_lease_seconds,
+        )
+
+    # Claimed events always belong to different users, so they can run concurrently
+    # and their AmoCRM writes coalesce in the shared service's batcher
+    await asyncio.gather(
+        *(process_event(event, amo_service, semaphore) for event in events)
+    )
+
+    if events:
+        logger.info(f"Processed {len(events)} outbox events, AmoCRM limiter: {amo_service.rate_limiter.stats()}")
+    return len(events)
+
+
+async def run_worker():
+    configure_models()
+    semaphore = asyncio.Semaphore(settings.crm_outbox_concurrency)
+    amo_service = await init_amocrm_service(settings.amo_crm_config)
+    logger.info("CRM outbox worker started")
+
+    try:
+        while True:
+            if amo_service.circuit.is_open():
+                # Leave events pending instead of leasing work that would fail
+                await asyncio.sleep(amo_service.circuit.retry_after)
+                continue
+
+            try:
+                processed = await drain_once(amo_service, semaphore)
+            except Exception as e:
+                logger.error(f"CRM outbox drain failed: {e}")
+                processed = 0
+
+            if processed < settings.crm_outbox_batch_size:
+                await asyncio.sleep(settings.crm_outbox_poll_interval)
+    finally:
+        await close_amocrm_service()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
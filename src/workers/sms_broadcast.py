@@ -0,0 +1,159 @@
+"""
+Send SMS broadcasts from ``sms_broadcasts`` through the Eskiz batch endpoint.
+
+Run as a separate process next to the API workers::
+
+    python -m src.workers.sms_broadcast
+"""
+import asyncio
+import logging
+
+import httpx
+
+from src.clients.eskiz import EskizAuthError
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.core.model_config import configure_models
+from src.service.sms import SMSService, check_sms_callback_config
+from src.service.sms_broadcast import SMSBroadcastService, broadcast_sms_id
+from src.utils.circuit_breaker import UPSTREAMS, CircuitOpenError, get_circuit_breaker
+from src.utils.throttle import TokenBucket, parse_retry_after
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def collect(service: SMSBroadcastService, broadcast):
+    while await service.collect_recipients(
+        broadcast, limit=settings.sms_broadcast_materialize_size
+    ):
+        await service.extend_lease(broadcast.id, settings.sms_broadcast_lease_seconds)
+    logger.info(f"Broadcast {broadcast.id}: recipients collected")
+
+
+# Eskiz answers that say "not now" rather than "these messages are wrong"
+PAUSE_STATUSES = (401, 429)
+
+
+async def send_chunk(
+    service: SMSBroadcastService,
+    sms_service: SMSService,
+    broadcast,
+    recipients: list,
+    bucket: TokenBucket,
+) -> bool:
+    """
+    Send ``recipients`` in one batch; ``False`` when Eskiz is unavailable.
+
+    A rejected batch is split in halves down to single messages, so one bad
+    number only fails its own recipient.
+    """
+    await bucket.acquire()
+    try:
+        response = await sms_service.send_batch(
+            [
+                {
+                    "user_sms_id": broadcast_sms_id(recipient.id),
+                    "to": recipient.phone_number,
+                    "text": broadcast.message,
+                }
+                for recipient in recipients
+            ],
+            dispatch_id=broadcast.id,
+        )
+    except (CircuitOpenError, EskizAuthError, httpx.TransportError) as e:
+        logger.warning(f"Broadcast {broadcast.id} paused: {e}")
+        return False
+
+    if response.status_code >= 500 or response.status_code in PAUSE_STATUSES:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if response.status_code == 429:
+            bucket.pause(retry_after or settings.sms_broadcast_poll_interval)
+        logger.warning(f"Broadcast {broadcast.id} paused: Eskiz answered {response.status_code}")
+        return False
+
+    recipient_ids = [recipient.id for recipient in recipients]
+    if response.status_code == 200:
+        await service.mark_recipients(broadcast.id, recipient_ids, sent=True)
+        return True
+
+    if len(recipients) > 1:
+        middle = len(recipients) // 2
+        for part in (recipients[:middle], recipients[middle:]):
+            if not await send_chunk(service, sms_service, broadcast, part, bucket):
+                return False
+        return True
+
+    error = f"{response.status_code} - {response.text}"
+    logger.warning(f"Broadcast {broadcast.id}: Eskiz rejected recipient {recipients[0].id}: {error}")
+    await service.mark_recipients(broadcast.id, recipient_ids, sent=False, error=error)
+    return True
+
+
+async def send(service: SMSBroadcastService, broadcast, bucket: TokenBucket) -> bool:
+    """Send every pending recipient; ``False`` when Eskiz is down and the rest stays pending"""
+    sms_service = SMSService(service.db)
+    after_id = 0
+
+    while True:
+        recipients = await service.next_recipients(
+            broadcast.id, after_id=after_id, limit=settings.sms_broadcast_chunk_size
+        )
+        if not recipients:
+            return True
+        after_id = recipients[-1].id
+
+        if not await send_chunk(service, sms_service, broadcast, recipients, bucket):
+            return False
+        await service.extend_lease(broadcast.id, settings.sms_broadcast_lease_seconds)
+
+
+async def run_once(bucket: TokenBucket) -> bool:
+    """Work on one broadcast; ``True`` when it finished and another may be waiting"""
+    async with AsyncSessionLocal() as session:
+        service = SMSBroadcastService(session)
+        broadcast = await service.claim(settings.sms_broadcast_lease_seconds)
+        if broadcast is None:
+            return False
+
+        logger.info(f"Broadcast {broadcast.id} ({broadcast.title}) started")
+        try:
+            await collect(service, broadcast)
+            finished = await send(service, broadcast, bucket)
+            if finished:
+                await service.finish(broadcast.id)
+                logger.info(f"Broadcast {broadcast.id} finished")
+            else:
+                await service.release(broadcast.id)
+        except Exception:
+            await session.rollback()
+            await service.release(broadcast.id)
+            raise
+        return finished
+
+
+async def run_worker():
+    configure_models()
+    bucket = TokenBucket(rate=settings.sms_broadcast_rate, capacity=1)
+    circuit = get_circuit_breaker(UPSTREAMS["SMS"])
+    check_sms_callback_config()
+    logger.info("SMS broadcast worker started")
+
+    while True:
+        if circuit.is_open():
+            await asyncio.sleep(circuit.retry_after)
+            continue
+
+        try:
+            finished = await run_once(bucket)
+        except Exception as e:
+            logger.error(f"SMS broadcast failed: {e}")
+            finished = False
+
+        if not finished:
+            await asyncio.sleep(settings.sms_broadcast_poll_interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
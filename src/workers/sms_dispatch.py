@@ -0,0 +1,108 @@
+"""
+Send queued SMS from ``sms_outbox_messages`` through Eskiz.
+
+Run as a separate process next to the API workers::
+
+    python -m src.workers.sms_dispatch
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from src.clients.eskiz import EskizAuthError
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.core.model_config import configure_models
+from src.models import SMSOutboxMessage
+from src.service.sms import SMSService, check_sms_callback_config
+from src.service.sms_outbox import SMSOutbox
+from src.utils.circuit_breaker import UPSTREAMS, CircuitOpenError, get_circuit_breaker
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def send_message(sms: SMSOutboxMessage, semaphore: asyncio.Semaphore):
+    async with semaphore, AsyncSessionLocal() as session:
+        outbox = SMSOutbox(session)
+        attempts = sms.attempts + 1
+
+        # A code nobody can enter any more is not worth sending
+        if sms.expires_at is not None and sms.expires_at <= datetime.now():
+            await outbox.mark_failed(
+                sms.id,
+                attempts=sms.attempts,
+                error="Verification session expired before the SMS was sent",
+                max_attempts=settings.sms_outbox_max_attempts,
+                backoff_seconds=settings.sms_outbox_backoff_seconds,
+                give_up=True,
+            )
+            return
+
+        try:
+            sent = await SMSService(session).deliver(
+                sms.phone_number, sms.message, user_sms_id=str(sms.id)
+            )
+            error = "Eskiz rejected the message"
+        except CircuitOpenError as e:
+            # Open or half-open with the probe taken; neither is this message's fault
+            await outbox.defer(sms.id, e.retry_after)
+            return
+        except EskizAuthError as e:
+            sent, error = False, str(e)
+        except Exception as e:
+            sent, error = False, str(e)
+
+        if sent:
+            await outbox.mark_sent(sms.id, attempts=attempts)
+            return
+
+        logger.warning(f"SMS {sms.id} to {sms.phone_number} failed on attempt {attempts}: {error}")
+        await outbox.mark_failed(
+            sms.id,
+            attempts=attempts,
+            error=error,
+            max_attempts=settings.sms_outbox_max_attempts,
+            backoff_seconds=settings.sms_outbox_backoff_seconds,
+        )
+
+
+async def drain_once(semaphore: asyncio.Semaphore) -> int:
+    async with AsyncSessionLocal() as session:
+        messages = await SMSOutbox(session).claim_batch(
+            limit=settings.sms_outbox_batch_size,
+            lease_seconds=settings.sms_outbox_lease_seconds,
+        )
+
+    await asyncio.gather(*(send_message(sms, semaphore) for sms in messages))
+
+    if messages:
+        logger.info(f"Processed {len(messages)} queued SMS")
+    return len(messages)
+
+
+async def run_worker():
+    configure_models()
+    semaphore = asyncio.Semaphore(settings.sms_outbox_concurrency)
+    circuit = get_circuit_breaker(UPSTREAMS["SMS"])
+    check_sms_callback_config()
+    logger.info("SMS dispatch worker started")
+
+    while True:
+        if circuit.is_open():
+            await asyncio.sleep(circuit.retry_after)
+            continue
+
+        try:
+            processed = await drain_once(semaphore)
+        except Exception as e:
+            logger.error(f"SMS outbox drain failed: {e}")
+            processed = 0
+
+        if processed < settings.sms_outbox_batch_size:
+            await asyncio.sleep(settings.sms_outbox_poll_interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
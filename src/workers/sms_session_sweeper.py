@@ -0,0 +1,62 @@
+"""
+Clean up finished SMS verification sessions and queued SMS.
+
+Expired rows are deleted in bounded batches. When ``sms_verification_session``
+is partitioned (alembic revision 0003) whole months past the retention are
+dropped and upcoming months are created ahead of time::
+
+    python -m src.workers.sms_session_sweeper          # run every sms_sweeper_interval
+    python -m src.workers.sms_session_sweeper --once
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.core.model_config import configure_models
+from src.service.sms_maintenance import SMSSessionMaintenance
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def sweep_once():
+    cutoff = datetime.now() - timedelta(days=settings.sms_session_retention_days)
+    async with AsyncSessionLocal() as session:
+        maintenance = SMSSessionMaintenance(session)
+
+        if await maintenance.is_partitioned():
+            created = await maintenance.ensure_partitions(settings.sms_partition_months_ahead)
+            dropped = await maintenance.drop_partitions_before(cutoff)
+            if created or dropped:
+                logger.info(f"Partitions created: {created}, dropped: {dropped}")
+
+        sessions = await maintenance.delete_expired_sessions(
+            older_than=cutoff, batch_size=settings.sms_sweeper_batch_size
+        )
+        messages = await maintenance.delete_finished_messages(
+            older_than=cutoff, batch_size=settings.sms_sweeper_batch_size
+        )
+
+    logger.info(f"Deleted {sessions} expired sessions and {messages} finished SMS")
+
+
+async def run(once: bool):
+    configure_models()
+    while True:
+        try:
+            await sweep_once()
+        except Exception as e:
+            logger.error(f"SMS session sweep failed: {e}")
+        if once:
+            return
+        await asyncio.sleep(settings.sms_sweeper_interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean up finished SMS verification sessions")
+    parser.add_argument("--once", action="store_true")
+    asyncio.run(run(parser.parse_args().once))